@@ -1,9 +1,14 @@
+import os
 import streamlit as st
 import numpy as np
 import math
 import plotly.graph_objects as go
-import plotly.io as pio
-import signals
+import cache
+import decimation
+import export
+import profiling
+import worker
+from signal_noise_generator.sampled import Signal
 
 # добавление кнопок
 if 'button_1' not in st.session_state: st.session_state.button_1 = False  # Выполнить формирование сигнала
@@ -12,6 +17,19 @@ if 'button_2' not in st.session_state: st.session_state.button_2 = False  # Сп
 
 if 'image_count' not in st.session_state: st.session_state.image_count = 1
 
+if 'jobs' not in st.session_state: st.session_state.jobs = {}  # фоновые задания сессии по слотам
+
+# профилирование запуска: переменная окружения SNG_PROFILE=1 или параметр адреса ?profile=1
+PROFILE = bool(os.environ.get('SNG_PROFILE') or st.query_params.get('profile'))
+if PROFILE:
+    st.sidebar.markdown('### Профилирование')
+    # журнал JSON и cProfile (общий для процесса и замедляющий все сеансы) включаются
+    # только на сервере (SNG_PROFILE_LOG, SNG_PROFILE), а не посетителем страницы
+    use_cprofile = bool(os.environ.get('SNG_PROFILE')) and st.sidebar.checkbox('cProfile')
+    started = profiling.start(os.environ.get('SNG_PROFILE_LOG') or None, use_cprofile)
+    if started.profile_error is not None:
+        st.sidebar.warning(f'cProfile не запущен: {started.profile_error}')
+
 
 # функции вкл и откл кнопок
 def buttons_off():
@@ -31,14 +49,200 @@ def button_2_on(): st.session_state.button_2 = True
 def button_2_off(): st.session_state.button_2 = False
 
 
+# проекция спектра (все виды получаются из одного преобразования)
+def spectrum_values(spec, spectrum):
+    x_val = spec.freq * 2 * np.pi  # перевод в рад/с
+    if spectrum == 'Амплитудный':  # нормировка по каждому каналу
+        amplitude = spec.amplitude
+        y_val = amplitude / np.maximum(amplitude.max(axis=-1, keepdims=True), np.finfo(float).tiny)
+    elif spectrum == 'Фазовый':
+        y_val = spec.phase
+    elif spectrum == 'Вещественный':
+        y_val = spec.scaled.real
+    elif spectrum == 'Мнимый':
+        y_val = spec.scaled.imag
+    else:  # комплексный
+        scaled = spec.scaled
+        x_val, y_val = scaled.real, scaled.imag
+    return x_val, y_val
+
+
+SPECTRA = ['Вещественный', 'Мнимый', 'Комплексный', 'Амплитудный', 'Фазовый']
+FFT_POLICIES = {'Обрезать до числа БПФ': 'truncate', 'Дополнить нулями до длины сигнала': 'pad',
+                'Дополнить до быстрой длины БПФ': 'fast'}
+WINDOWS = {'Прямоугольное': None, 'Ханна': 'hann', 'Хэмминга': 'hamming', 'Блэкмана': 'blackman'}
+SPECTRUM_MODES = ('БПФ', 'Усреднённый спектр (Уэлч)', 'Спектрограмма (STFT)')
+OVERLAPS = {'0 %': 0.0, '50 %': 0.5, '75 %': 0.75}
+PLOT_WIDTH = 1200  # ширина графика в пикселях, по ней прореживаются точки
+MAX_HARMONICS = 500
+MAX_CHANNELS = 64  # каналов в многоканальном режиме (сигналы с разными параметрами на одном графике)
+NOISE_KINDS = {'Белый': 'white', 'Розовый': 'pink', 'Белый через ФНЧ': 'filtered', 'Импульсный': 'impulse'}
+JOB_WAIT = 0.3  # сколько ждать фоновое задание, прежде чем показать ход выполнения (с)
+
+
+# таблица этапов для боковой панели
+def profile_rows(stages):
+    return [{'Этап': '· ' * s.depth + s.name, 'мс': round(s.seconds * 1e3, 2), 'Отсчётов': s.samples,
+             'МБ': None if s.nbytes is None else round(s.nbytes / 2 ** 20, 3)} for s in stages]
+
+
+# время этапов запуска, скачиваний предыдущего запуска и статистика cProfile
+def profile_panel(run, previous):
+    st.sidebar.write(f'Запуск сценария: {run.seconds * 1e3:.1f} мс')
+    st.sidebar.dataframe(profile_rows(run.stages), hide_index=True)
+    if previous is not None and previous.deferred:
+        st.sidebar.write('Отложенные этапы (скачивания, фоновые задания)')
+        st.sidebar.dataframe(profile_rows(previous.deferred), hide_index=True)
+    if run.profiler is not None:
+        with st.sidebar.expander('cProfile'):
+            st.code(run.profile_text())
+        st.sidebar.download_button('profile.prof', data=run.profile_dump(), file_name='profile.prof',
+                                   help='Открыть: python -m pstats profile.prof')
+
+
+# завершение запуска сценария до конца страницы (с выводом профиля)
+def stop():
+    if PROFILE:
+        profile_run = profiling.finish()
+        profile_panel(profile_run, st.session_state.get('profile_run'))
+        st.session_state.profile_run = profile_run
+    st.stop()
+
+
+# ход выполнения фонового задания; после завершения сценарий перезапускается целиком
+@st.fragment(run_every=0.5)
+def job_status(slot):
+    job = st.session_state.jobs.get(slot)
+    if job is None or job.done() or job.cancelled():
+        st.rerun()
+    st.progress(min(job.progress, 1.0), text=f'{job.text}: {job.elapsed:.1f} с')
+    if st.button('Отменить', key=f'cancel_{slot}'):
+        job.cancel()
+        st.rerun()
+
+
+# результат фонового задания; пока оно выполняется, вместо остальной страницы показывается ход выполнения.
+# key - ключ результата в кэше: готовый результат читается сразу, без очереди общего пула потоков
+def background(slot, key, text, function, *args, cached=cache.cached):
+    jobs = st.session_state.jobs
+    result = cached(key)
+    if result is not None:
+        worker.discard(jobs, slot)  # прежнее задание слота больше не нужно
+        return result
+    job = worker.submit(jobs, slot, key, text, function, *args)
+    if job.cancelled():
+        st.info(f'{text}: отменено')
+        if st.button('Повторить', key=f'retry_{slot}'):
+            worker.discard(jobs, slot)
+            st.rerun()
+        stop()
+    if not job.wait(JOB_WAIT):
+        job_status(slot)
+        stop()
+    del jobs[slot]  # результат не удерживается в сессии (он остаётся в кэше)
+    return job.result()
+
+
+# фоновое задание: сигнал и номера отображаемых отсчётов каждого канала (прореживание по ширине графика)
+def signal_job(signal_args):
+    signal_key, sig = cache.signal(*signal_args)
+    worker.progress(0.8, 'Прореживание для графика')
+    return signal_key, sig, cache.indices(signal_key, sig.samples, PLOT_WIDTH)
+
+
+# сигнал и номера отображаемых отсчётов из кэша (None, если чего-то нет)
+def cached_signal(signal_key):
+    sig = cache.cached(signal_key)
+    indexes = cache.cached(cache.indices_key(signal_key, PLOT_WIDTH)) if sig is not None else None
+    return None if indexes is None else (signal_key, sig[1], indexes[1])
+
+
+# значения по каналам через " ;" (пустая строка - нет дополнительных каналов)
+def channel_values(text, convert=float):
+    text = text.replace(',', '.').strip()
+    return [convert(value) for value in text.split(';')] if text else []
+
+
+# название канала в легенде графика (None для одноканального сигнала)
+def channel_name(names, index):
+    return None if names is None else names[index]
+
+
+# график спектра; для многоканального сигнала - по линии на канал
+@profiling.timed('График спектра')
+def spectrum_figure(spectrum_key, spec, spectrum, names=None):
+    x_title = 'Частота (рад/с)'  # заменила на рад/с, потому что умножили на 2*pi
+    y_title = ''
+    if spectrum == 'Фазовый':
+        y_title = 'Phase'
+    elif spectrum == 'Комплексный':
+        x_title = 'Re'
+        y_title = 'Im'
+    x_val, y_val = cache.projection(spectrum_key, spectrum, lambda: spectrum_values(spec, spectrum))
+    fig_1 = go.Figure()
+    y_rows = np.atleast_2d(y_val)
+    for index, (x_row, y_row) in enumerate(zip(np.broadcast_to(x_val, y_rows.shape), y_rows)):
+        if spectrum != 'Комплексный':  # параметрическую кривую Re/Im не прореживаем
+            x_row, y_row = decimation.minmax_decimate(x_row, y_row, PLOT_WIDTH)
+        fig_1.add_trace(go.Scatter(x=x_row, y=y_row, mode='lines', name=channel_name(names, index)))
+    fig_1.update_layout(title=f'{spectrum} спектр\n', title_x=0.45, margin=dict(l=15, r=30, t=60, b=20),
+                        template='ggplot2', width=PLOT_WIDTH, height=500)
+    fig_1.update_xaxes(title_text=x_title, showgrid=True, title_font_color='black', linecolor='black',
+                       mirror=True)
+    fig_1.update_yaxes(title_text=y_title, showgrid=True, title_font=dict(color='black'), linecolor='black',
+                       mirror=True)
+    return fig_1
+
+
+# усреднённая спектральная плотность мощности (дБ)
+@profiling.timed('График спектра')
+def welch_figure(freq, psd, names=None):
+    fig_1 = go.Figure()
+    for index, row in enumerate(np.atleast_2d(psd)):
+        x_val, y_val = decimation.minmax_decimate(freq * 2 * np.pi, 10 * np.log10(row + 1e-300), PLOT_WIDTH)
+        fig_1.add_trace(go.Scatter(x=x_val, y=y_val, mode='lines', name=channel_name(names, index)))
+    fig_1.update_layout(title='Усреднённый спектр (метод Уэлча)\n', title_x=0.45,
+                        margin=dict(l=15, r=30, t=60, b=20), template='ggplot2', width=PLOT_WIDTH, height=500)
+    fig_1.update_xaxes(title_text='Частота (рад/с)', showgrid=True, title_font_color='black', linecolor='black',
+                       mirror=True)
+    fig_1.update_yaxes(title_text='СПМ (дБ)', showgrid=True, title_font=dict(color='black'), linecolor='black',
+                       mirror=True)
+    return fig_1
+
+
+# спектрограмма: мощность сегментов во времени (дБ)
+@profiling.timed('График спектрограммы')
+def spectrogram_figure(times, freq, power):
+    fig_1 = go.Figure()
+    fig_1.add_trace(go.Heatmap(x=times, y=freq * 2 * np.pi, z=10 * np.log10(power + 1e-300), colorscale='Viridis',
+                               colorbar=dict(title='дБ')))
+    fig_1.update_layout(title='Спектрограмма\n', title_x=0.45, margin=dict(l=15, r=30, t=60, b=20),
+                        template='ggplot2', width=PLOT_WIDTH, height=500)
+    fig_1.update_xaxes(title_text='Время (c)', title_font_color='black', linecolor='black', mirror=True)
+    fig_1.update_yaxes(title_text='Частота (рад/с)', title_font=dict(color='black'), linecolor='black', mirror=True)
+    return fig_1
+
+
+# все пять спектров одним архивом (один сеанс Kaleido)
+def spectra_zip(spectrum_key, spec, image_count, names=None):
+    figs = [spectrum_figure(spectrum_key, spec, spectrum, names) for spectrum in SPECTRA]
+    keys = [(spectrum_key, spectrum) for spectrum in SPECTRA]
+    names = [f'{spectrum}_спектр_сигнала_{image_count}.jpg' for spectrum in SPECTRA]
+    return export.zip_images(keys, figs, names, width=1200, height=500)
+
+
 # основная часть
 st.markdown('## Временное и частотное представление сигналов')
 # ввод параметров
-signal_type = st.selectbox('Тип сигнала', ('Периодический', 'Апериодический', 'Специальный'), on_change=buttons_off)
+signal_type = st.selectbox('Тип сигнала', ('Периодический', 'Апериодический', 'Специальный', 'Зашумлённый'),
+                           on_change=buttons_off)
 # сигналы
-signal = [0];
-t = [0];
+sig = Signal(np.zeros(1), 1.0)  # сигнал по умолчанию (при ошибке ввода параметров)
+indexes = [np.zeros(1, dtype=np.intp)]  # отображаемые отсчёты по каналам
 points = 0
+signal_args = None  # имя генератора и его параметры (ключ кэша)
+channel_names = None  # названия каналов многоканального сигнала
+signal_key = None
 if signal_type == 'Периодический':
     signal_kind = st.selectbox('Вид сигнала', (
     'Гармонический', 'Полигармонический', 'Однополярные импульсы', 'Разнополярные импульсы'), on_change=buttons_off)
@@ -55,27 +259,39 @@ if signal_type == 'Периодический':
                                value=round(period / 62.8, 3), step=0.001, format="%0.3f")
         shift = st.number_input('Фазовый сдвиг 0,0 ≤ phi ≤ 6,28 (рад)', min_value=0.0, max_value=6.28, value=0.0,
                                 step=0.01, format="%0.2f")
+        shifts = st.text_input('Фазовые сдвиги других каналов через " ;" (рад)', '', placeholder='0.79; 1.57',
+                               on_change=buttons_off)
         frequency = round(1 / period, 3)
         y_tick = 0.2;
         x_tick = round(duration / 12, 1)
-        t, signal = signals.generate_harmonic(frequency, duration, step, shift)
+        try:
+            shifts = channel_values(shifts)
+            if len(shifts) < MAX_CHANNELS:
+                if shifts:  # сдвиги по каналам: один сигнал формы (каналы, отсчёты)
+                    shift = [shift] + shifts
+                    channel_names = [f'phi = {value:g}' for value in shift]
+                signal_args = ('generate_harmonic', frequency, duration, step, shift)
+            else:
+                st.warning(f'Количество каналов превышает {MAX_CHANNELS}')
+        except ValueError:
+            st.warning('Ошибка ввода параметров')
 
     elif signal_kind == 'Полигармонический':
-        st.write('Количество гармоник 1 ≤ KG ≤ 7')
+        st.write(f'Количество гармоник 1 ≤ KG ≤ {MAX_HARMONICS}')
         frequencies = st.text_input('Частоты гармоник через " ;"', '1; 2; 3')
         frequencies = frequencies.replace(',', '.')
         try:
             frequencies = list(map(float, frequencies.split(';')))
-            if (len(frequencies) < 8):
+            if (len(frequencies) <= MAX_HARMONICS):
                 duration = st.number_input('Интервал задания сигнала 0,001 ≤ TN ≤ 10 (с)', min_value=0.001,
                                            max_value=10.0, value=1.2, step=0.001, format="%0.3f")
                 step = st.number_input('Шаг дискретизации 0,001 ≤ Δt ≤ 2,0 (c)', min_value=0.001, max_value=2.0,
                                        value=round((1 / min(frequencies)) / 62.8, 3), step=0.001, format="%0.3f")
                 y_tick = 0.5;
                 x_tick = round(duration / 12, 1)
-                t, signal = signals.generate_poliharmonic(frequencies, duration, step)
+                signal_args = ('generate_poliharmonic', frequencies, duration, step)
             else:
-                st.warning('Количество гармоник превышает 7')
+                st.warning(f'Количество гармоник превышает {MAX_HARMONICS}')
                 frequencies = [0]
         except Exception as e:
             st.warning('Ошибка ввода параметров')
@@ -90,12 +306,34 @@ if signal_type == 'Периодический':
         step = st.number_input('Шаг дискретизации 0,001 ≤ Δt ≤ 2,0 (c)', min_value=0.001, max_value=2.0,
                                value=round(pulse_duration / 62.8, 3), step=0.001, format="%0.3f")
 
-        signal_duration = pulse_duration * pulses_count;
-        if signal_interval == '5 * KG * T': signal_duration *= 5
+        # интервал задаётся первым каналом: он совпадает с одноканальным сигналом
+        interval_pulses = pulses_count * 5 if signal_interval == '5 * KG * T' else pulses_count
+        max_count = min(7, interval_pulses)  # другие каналы - в пределах поля KG и интервала
+        counts = st.text_input(f'Количество импульсов других каналов через " ;" (3 ≤ KG ≤ {max_count})', '',
+                               placeholder='3; 5', on_change=buttons_off)
+        pulses = None  # без ограничения числа импульсов (один канал)
+        try:
+            counts = channel_values(counts, int)
+            if len(counts) >= MAX_CHANNELS:
+                st.warning(f'Количество каналов превышает {MAX_CHANNELS}')
+            elif any(not 3 <= value <= max_count for value in counts):
+                st.warning(f'Количество импульсов канала должно быть от 3 до {max_count}')
+            elif interval_pulses in counts:
+                st.warning(f'Канал с {interval_pulses} импульсами уже есть: это первый канал')
+            elif counts:  # каналы с разным числом импульсов на общем интервале
+                pulses = [interval_pulses] + counts
+                # подпись - число импульсов, с которым сформирован канал (у первого 5 * KG на интервале 5 * KG * T)
+                channel_names = [f'Импульсов: {value}' for value in pulses]
+        except ValueError:
+            st.warning('Ошибка ввода параметров')
+
+        signal_duration = pulse_duration * interval_pulses;
         if signal_kind == 'Однополярные импульсы':
-            t, signal = signals.generate_unipolar_pulses(signal_duration, pulse_duration, step)
+            signal_args = ('generate_unipolar_pulses', signal_duration, pulse_duration, step)
         else:
-            t, signal = signals.generate_bipolar_pulses(signal_duration, pulse_duration, step)
+            signal_args = ('generate_bipolar_pulses', signal_duration, pulse_duration, step)
+        if pulses is not None:
+            signal_args += (pulses,)
         y_tick = 0.2;
         x_tick = round(signal_duration / 12, 1)
 
@@ -111,10 +349,46 @@ elif signal_type == 'Апериодический':
                                    value=2.0, step=0.1, format="%0.1f")
         step = st.number_input('Шаг дискретизации 0,001  ≤ Δt  ≤ 0,1 (с)', min_value=0.001, max_value=0.1, value=0.01,
                                step=0.001, format="%0.3f")
-        t, signal = signals.generate_damped_sine(alpha, frequency, duration, step)
+        signal_args = ('generate_damped_sine', alpha, frequency, duration, step)
         y_tick = 0.5
         x_tick = round(duration / 12, 1)
-        points = len(signal)
+
+elif signal_type == 'Зашумлённый':
+    signal_kind = st.selectbox('Вид сигнала', ('Гармонический', 'Затухающая синусоида', 'Однополярные импульсы'),
+                               on_change=buttons_off)
+    duration = st.number_input('Длительность сигнала 0,1 ≤ T ≤ 100,0 (с)', min_value=0.1, max_value=100.0,
+                               value=10.0, step=0.1, format="%0.1f")
+    step = st.number_input('Шаг дискретизации 0,0001 ≤ Δt ≤ 0,1 (с)', min_value=0.0001, max_value=0.1, value=0.001,
+                           step=0.0001, format="%0.4f")
+    if signal_kind == 'Гармонический':
+        frequency = st.number_input('Частота 0,1 ≤ f ≤ 50,0 (Гц)', min_value=0.1, max_value=50.0, value=2.0,
+                                    step=0.1, format="%0.1f")
+        base = ('generate_harmonic', frequency, duration, step, 0.0)
+    elif signal_kind == 'Затухающая синусоида':
+        frequency = st.number_input('Частота 0,1 ≤ f ≤ 50,0 (Гц)', min_value=0.1, max_value=50.0, value=5.0,
+                                    step=0.1, format="%0.1f")
+        base = ('generate_damped_sine', 0.5, frequency, duration, step)
+    else:
+        pulse_duration = st.number_input('Длительность импульса 0,1 ≤ T ≤ 10,0 (с)', min_value=0.1, max_value=10.0,
+                                         value=1.0, step=0.1, format="%0.1f")
+        base = ('generate_unipolar_pulses', duration, pulse_duration, step)
+    noise_column, snr_column, seed_column = st.columns(3)
+    noise = noise_column.selectbox('Шум', tuple(NOISE_KINDS))
+    snr_db = snr_column.number_input('ОСШ -20 ≤ SNR ≤ 60 (дБ)', min_value=-20.0, max_value=60.0, value=10.0,
+                                     step=1.0, format="%0.1f")
+    seed = seed_column.number_input('Зерно', min_value=0, value=0, step=1, format="%d")
+    noise_params = ()
+    if noise == 'Белый через ФНЧ':
+        cutoff = st.number_input(f'Частота среза 0,1 ≤ fc < {0.5 / step:g} (Гц)', min_value=0.1,
+                                 max_value=0.5 / step * 0.99, value=min(10.0, 0.25 / step), step=0.1, format="%0.1f")
+        noise_params = (('cutoff', cutoff),)
+    elif noise == 'Импульсный':
+        density = st.number_input('Доля отсчётов с импульсами 0,001 ≤ p ≤ 0,5', min_value=0.001, max_value=0.5,
+                                  value=0.01, step=0.001, format="%0.3f")
+        noise_params = (('density', density),)
+    signal_args = ('generate_noisy', base, NOISE_KINDS[noise], snr_db, seed, noise_params)
+    y_tick = None
+    x_tick = round(duration / 12, 1)
 
 else:  # cпециальный
     signal_kind = st.selectbox('Вид сигнала', ('Одиночный импульс', 'Единичный скачок', 'Дельта-функция'),
@@ -133,8 +407,7 @@ else:  # cпециальный
             interval = 20 * duration
         y_tick = 0.1;
         x_tick = round(interval / 10, 1)
-        t, signal = signals.single_pulse(duration, interval, step)
-        points = len(signal)
+        signal_args = ('single_pulse', duration, interval, step)
     elif signal_kind == 'Единичный скачок':
         moment = st.number_input('Момент скачка 1 <= T <= 20 (c)', min_value=1, max_value=20, value=2, step=1,
                                  format="%d")
@@ -143,7 +416,7 @@ else:  # cпециальный
                                step=0.001, format="%0.3f")
         y_tick = 1;
         x_tick = round(moment / 20, 1)
-        t, signal = signals.unit_step(0, moment + 0.001, step)
+        signal_args = ('unit_step', 0, moment + 0.001, step)
     else:
         amplitude = st.selectbox('Амплитуда',
                                  ('1000', '2000', '3000', '4000', '5000', '6000', '7000', '8000', '9000', '10000'))
@@ -162,79 +435,135 @@ else:  # cпециальный
             duration = 10 * moment
         y_tick = 1000;
         x_tick = round(duration / 20, 1)
-        t, signal = signals.delta_function(amplitude, moment, duration + 0.001, step)
+        signal_args = ('delta_function', amplitude, moment, duration + 0.001, step)
+
+if signal_args is not None:
+    with profiling.stage('Сигнал') as stage:
+        signal_key, sig, indexes = background('signal', cache.signal_key(*signal_args), 'Формирование сигнала',
+                                              signal_job, signal_args, cached=cached_signal)
+        stage.set(sig)
+else:
+    worker.discard(st.session_state.jobs, 'signal')
+signal, step = sig.samples, sig.delta_t
 
 # формирование сигнала
 st.button('Выполнить формирование сигнала', on_click=button_1_on)
 if st.session_state.button_1:  # кнопка нажата
-    fig = go.Figure()
-    fig.add_trace(go.Scatter(x=t, y=signal, mode='lines'))
-    fig.update_layout(title='Вид сигнала\n', title_x=0.49, margin=dict(l=15, r=30, t=60, b=20), template='plotly',
-                      width=1200, height=500)
-    fig.update_xaxes(title_text='Время (c)', showgrid=True, title_font_color='black', linecolor='black', dtick=x_tick,
-                     mirror=True)
-    fig.update_yaxes(title_text='Амплитуда', showgrid=True, title_font=dict(color='black'), linecolor='black',
-                     dtick=y_tick, mirror=True)
+    # ось времени строится только для отображаемых точек
+    with profiling.stage('Точки графика') as stage:
+        plot_points = stage.set([(sig.time(index), row[index]) for row, index in zip(np.atleast_2d(signal), indexes)])
+    with profiling.stage('График сигнала'):
+        fig = go.Figure()
+        for channel, (t_plot, signal_plot) in enumerate(plot_points):
+            fig.add_trace(go.Scatter(x=t_plot, y=signal_plot, mode='lines', name=channel_name(channel_names, channel)))
+        fig.update_layout(title='Вид сигнала\n', title_x=0.49, margin=dict(l=15, r=30, t=60, b=20),
+                          template='plotly', width=PLOT_WIDTH, height=500)
+        fig.update_xaxes(title_text='Время (c)', showgrid=True, title_font_color='black', linecolor='black',
+                         dtick=x_tick, mirror=True)
+        fig.update_yaxes(title_text='Амплитуда', showgrid=True, title_font=dict(color='black'), linecolor='black',
+                         dtick=y_tick, mirror=True)
     # сохранение
-    print_points, save = st.columns([9, 1])
-    points = len(signal)
-    print_points.write(f'Количество точек = {points}')
+    print_points, save_data, save = st.columns([8, 1, 1])
+    points = len(sig)
+    channels_text = f', каналов = {len(plot_points)}' if signal.ndim > 1 else ''
+    print_points.write(f'Количество точек = {points}{channels_text} '
+                       f'(отображено {sum(len(y) for t, y in plot_points)})')
+    with save_data:
+        # отсчёты сигнала в двоичном виде (float32, время задаётся t0 и Δt в заголовке)
+        st.download_button(label='SIG', icon=':material/download:', help='Отсчёты сигнала (float32)',
+                           data=profiling.deferred(lambda: export.signal_bytes(sig), 'Экспорт SIG'),
+                           file_name=f'Сигнал_{st.session_state.image_count}.sig')
     with save:
-        image = pio.to_image(fig, format='jpg', width=1050, height=675)
+        # изображение формируется только при нажатии на кнопку
+        image = export.lazy_image(signal_key, fig, width=1050, height=675)
         if st.download_button(label='', icon=':material/download:', data=image,
                               file_name=f'График_сигнала_{st.session_state.image_count}.jpg'):
             st.session_state.image_count += 1
             # график сигнала
-    st.plotly_chart(fig, use_container_width=True, config={"displaylogo": False})
+    with profiling.stage('st.plotly_chart (сериализация)'):
+        st.plotly_chart(fig, use_container_width=True, config={"displaylogo": False})
     # спектры
     st.button('Спектр сигнала', on_click=button_2_on)
     if st.session_state.button_2:
-        bpf_select = st.selectbox('Число БПФ', ('128', '256', '256', '512', '1024', '2048', '4096'), index=4)
-        bpf = int(bpf_select)
-        # FFT сигнала
-        fft_val = np.fft.fft(signal, n=bpf)
-        fft_freq = np.fft.fftfreq(bpf, step)
-        indexes = (fft_freq >= 0)  # только неотрицательные частоты
-        fft_val = fft_val[indexes]
-        fft_freq = fft_freq[indexes]
-        fft_freq = fft_freq * 2 * np.pi  # перевод в рад/с
-        x_val = fft_freq
-        x_title = 'Частота (рад/с)'  # заменила на рад/с, потому что умножили на 2*pi
-        y_title = ''
-        spectrum = st.radio('**Спектры:**', ['Вещественный', 'Мнимый', 'Комплексный', 'Амплитудный', 'Фазовый'],
-                            index=None)
-        if spectrum == 'Амплитудный':
-            y_val = np.abs(fft_val)
-            y_val /= max(y_val)
-        elif spectrum == 'Фазовый':
-            y_val = np.angle(fft_val)
-            y_title = 'Phase'
-        else:
-            fft_val /= bpf
-            fft_val[1:] = 2 * fft_val[1:]
-            if spectrum == 'Вещественный':
-                y_val = np.real(fft_val)
-            elif spectrum == 'Мнимый':
-                y_val = np.imag(fft_val)
-            elif spectrum == 'Комплексный':
-                x_val = np.real(fft_val)
-                x_title = 'Re'
-                y_val = np.imag(fft_val)
-                y_title = 'Im'
-                # график спектра
-        if spectrum != None:
-            fig_1 = go.Figure()
-            fig_1.add_trace(go.Scatter(x=x_val, y=y_val, mode='lines'))
-            fig_1.update_layout(title=f'{spectrum} спектр\n', title_x=0.45, margin=dict(l=15, r=30, t=60, b=20),
-                                template='ggplot2', width=1200, height=500)
-            fig_1.update_xaxes(title_text=x_title, showgrid=True, title_font_color='black', linecolor='black',
-                               mirror=True)
-            fig_1.update_yaxes(title_text=y_title, showgrid=True, title_font=dict(color='black'), linecolor='black',
-                               mirror=True)
+        mode = st.selectbox('Режим', SPECTRUM_MODES)
+        if mode == 'БПФ':
+            bpf_select = st.selectbox('Число БПФ', ('128', '256', '256', '512', '1024', '2048', '4096'), index=4)
+            bpf = int(bpf_select)
+            policy_column, window_column = st.columns(2)
+            policy = policy_column.selectbox('Длина БПФ', tuple(FFT_POLICIES))
+            window_name = window_column.selectbox('Окно', tuple(WINDOWS))
+            # спектр сигнала (только неотрицательные частоты, кэшируется по сигналу и параметрам БПФ)
+            with profiling.stage('Спектр') as stage:
+                spectrum_args = (signal_key, step, bpf, FFT_POLICIES[policy], WINDOWS[window_name])
+                spectrum_key, spec = background('spectrum', cache.spectrum_key(*spectrum_args), 'Спектр',
+                                                cache.spectrum, signal_key, signal, *spectrum_args[1:])
+                stage.set(spec)
+            spectrum_select, save_data, save_all = st.columns([8, 1, 1])
+            spectrum = spectrum_select.radio('**Спектры:**', SPECTRA, index=None)
+            image_count = st.session_state.image_count
+            with save_data:
+                st.download_button(label='SPC', icon=':material/download:', help='Комплексный спектр (complex64)',
+                                   data=profiling.deferred(lambda: export.spectrum_bytes(spec), 'Экспорт SPC'),
+                                   file_name=f'Спектр_сигнала_{image_count}.spc')
+            with save_all:
+                st.download_button(label='ZIP', icon=':material/download:', help='Все спектры одним архивом',
+                                   data=profiling.deferred(
+                                       lambda: spectra_zip(spectrum_key, spec, image_count, channel_names),
+                                       'Экспорт ZIP'),
+                                   file_name=f'Спектры_сигнала_{image_count}.zip')
+            # график спектра
+            if spectrum != None:
+                fig_1 = spectrum_figure(spectrum_key, spec, spectrum, channel_names)
+                # сохранение
+                column_1, save_1 = st.columns([9, 1])
+                column_1.write(f'Длина БПФ = {spec.n}, количество точек = {len(spec.freq)} '
+                               f'(отображено {len(fig_1.data[0].y)})')
+                with save_1:
+                    image = export.lazy_image((spectrum_key, spectrum), fig_1, width=1200, height=500)
+                    st.download_button(label='', icon=':material/download:', data=image,
+                                       file_name=f'{spectrum}_спектр_сигнала_{st.session_state.image_count}.jpg')
+                with profiling.stage('st.plotly_chart (сериализация)'):
+                    st.plotly_chart(fig_1)
+        else:  # спектр по сегментам сигнала
+            segment_column, overlap_column, window_column = st.columns(3)
+            nperseg = int(segment_column.selectbox('Длина сегмента', ('64', '128', '256', '512', '1024'), index=2))
+            nperseg = min(nperseg, len(sig))
+            overlap = overlap_column.selectbox('Перекрытие сегментов', tuple(OVERLAPS), index=1)
+            noverlap = int(nperseg * OVERLAPS[overlap])
+            window_name = window_column.selectbox('Окно', tuple(WINDOWS), index=1)
+            segments = (len(sig) - nperseg) // (nperseg - noverlap) + 1
+            if mode == SPECTRUM_MODES[1]:
+                with profiling.stage('Спектр Уэлча') as stage:
+                    segment_args = (signal_key, step, nperseg, noverlap, WINDOWS[window_name])
+                    segment_key, (freq, psd) = background(
+                        'spectrum', cache.welch_key(*segment_args), 'Спектр Уэлча',
+                        cache.welch, signal_key, signal, *segment_args[1:])
+                    stage.set(psd)
+                fig_1 = welch_figure(freq, psd, channel_names)
+            else:
+                average = max(1, -(-segments // PLOT_WIDTH))  # не больше одного столбца на пиксель
+                with profiling.stage('Спектрограмма') as stage:
+                    segment_args = (signal_key, step, nperseg, noverlap, WINDOWS[window_name], average)
+                    segment_key, (times, freq, power) = background(
+                        'spectrum', cache.spectrogram_key(*segment_args), 'Спектрограмма',
+                        cache.spectrogram, signal_key, signal, *segment_args[1:])
+                    stage.set(power)
+                if power.ndim > 2:  # спектрограммы всех каналов считаются сразу, показывается одна
+                    channel = st.selectbox('Канал', range(len(power)), format_func=lambda k: channel_names[k])
+                    power = power[channel]
+                    segment_key = (segment_key, channel)
+                fig_1 = spectrogram_figure(times, freq, power)
             # сохранение
             column_1, save_1 = st.columns([9, 1])
+            column_1.write(f'Количество сегментов = {segments}, длина сегмента = {nperseg}')
             with save_1:
-                image = pio.to_image(fig_1, format='jpg', width=1200, height=500)
+                image = export.lazy_image(segment_key, fig_1, width=1200, height=500)
                 st.download_button(label='', icon=':material/download:', data=image,
-                                   file_name=f'{spectrum}_спектр_сигнала_{st.session_state.image_count}.jpg')
-            st.plotly_chart(fig_1)
\ No newline at end of file
+                                   file_name=f'{mode}_{st.session_state.image_count}.jpg')
+            with profiling.stage('st.plotly_chart (сериализация)'):
+                st.plotly_chart(fig_1)
+
+if PROFILE:
+    profile_run = profiling.finish()
+    profile_panel(profile_run, st.session_state.get('profile_run'))
+    st.session_state.profile_run = profile_run
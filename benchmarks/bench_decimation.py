@@ -0,0 +1,25 @@
+import os
+import sys
+import timeit
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import decimation  # noqa: E402
+
+WIDTH = 1200  # ширина графика в app.py
+
+
+def main():
+    print(f'{"точек":>10} {"время (мс)":>12} {"отображено":>12}')
+    for size in (10 ** 3, 10 ** 4, 10 ** 5, 10 ** 6, 10 ** 7):
+        t = np.arange(size) * 0.001
+        s = np.sin(2 * np.pi * t) + 0.1 * np.random.normal(size=size)
+        repeat = max(1, 10 ** 6 // size)
+        elapsed = min(timeit.repeat(lambda: decimation.minmax_decimate(t, s, WIDTH), number=repeat, repeat=3)) / repeat
+        shown = len(decimation.minmax_indices(s, WIDTH))
+        print(f'{size:>10} {elapsed * 1e3:>12.3f} {shown:>12}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,82 @@
+import os
+import sys
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import decimation  # noqa: E402
+import signals  # noqa: E402
+from signal_noise_generator.noise_generator import filters, mixing, noises  # noqa: E402
+from signal_noise_generator.signal_generator import signals as generators  # noqa: E402
+from signal_noise_generator.spectrum import spectra  # noqa: E402
+
+# Набор замеряемых функций: имя -> (функция, аргументы для сигнала примерно из n отсчётов).
+# Используется и для замеров (run.py), и для эталонных выходов (golden.py).
+
+DT = 0.001  # шаг дискретизации во всех случаях
+CHANNELS = 64  # многоканальные случаи: n отсчётов делятся на CHANNELS каналов
+
+
+def _test_signal(n):
+    return np.sin(2 * np.pi * 5 * np.arange(n) * DT) + 0.1 * np.cos(2 * np.pi * 120 * np.arange(n) * DT)
+
+
+CASES = {
+    # signals.py
+    'signals.pulse_train': (signals.pulse_train, lambda n: (n * DT, 0.628, DT, 0.3, 2.0, (1, -1))),
+    'signals.generate_unipolar_pulses': (signals.generate_unipolar_pulses, lambda n: (n * DT, 0.628, DT)),
+    'signals.generate_bipolar_pulses': (signals.generate_bipolar_pulses, lambda n: (n * DT, 0.628, DT)),
+    'signals.generate_harmonic': (signals.generate_harmonic, lambda n: (5.0, n * DT, DT, 0.5)),
+    'signals.generate_poliharmonic': (signals.generate_poliharmonic, lambda n: ([1, 2, 3, 5, 8], n * DT, DT)),
+    'signals.generate_damped_sine': (signals.generate_damped_sine, lambda n: (1.0, 5.0, n * DT, DT)),
+    'signals.generate_noisy': (signals.generate_noisy,
+                               lambda n: (('generate_harmonic', 5.0, n * DT, DT, 0.5), 'white', 10.0, 0)),
+    'signals.generate_harmonic[64ch]': (signals.generate_harmonic,
+                                        lambda n: (5.0, n // CHANNELS * DT, DT, np.linspace(0, np.pi, CHANNELS))),
+    # signal_noise_generator.signal_generator.signals
+    'generators.harmonic_signal': (generators.harmonic_signal, lambda n: (1.0, 0.5, n * DT, DT)),
+    'generators.polyharmonic_signal': (generators.polyharmonic_signal, lambda n: (0.5, n * DT, DT, [1, 0.5, 0.3])),
+    'generators.polyharmonic_synthesis': (generators.polyharmonic_synthesis,
+                                          lambda n: (np.arange(1, 201), n, DT, 0.0, 1 / np.arange(1, 201))),
+    'generators.unipolar_pulses': (generators.unipolar_pulses, lambda n: (n * DT / 10, 5, n * DT, DT)),
+    'generators.bipolar_pulses': (generators.bipolar_pulses, lambda n: (n * DT / 10, 5, n * DT, DT)),
+    'generators.damped_sine_wave': (generators.damped_sine_wave, lambda n: (1.0, 0.5, 2.0, n * DT, DT)),
+    'generators.single_pulse': (generators.single_pulse, lambda n: (n * DT / 2, n * DT, DT)),
+    'generators.single_rectangular_pulse': (generators.single_rectangular_pulse,
+                                            lambda n: (1.0, n * DT / 4, n * DT, DT)),
+    'generators.single_exponential_pulse': (generators.single_exponential_pulse, lambda n: (1.0, 1.0, n * DT, DT)),
+    'generators.unit_step': (generators.unit_step, lambda n: (n * DT / 2, n * DT, DT)),
+    'generators.delta_function': (generators.delta_function, lambda n: (1000, n * DT / 2, n * DT, DT)),
+    'generators.triangular_signal': (generators.triangular_signal, lambda n: (1.0, 0.5, n * DT, DT)),
+    # signal_noise_generator.noise_generator.noises
+    'noises.white_noise': (noises.white_noise, lambda n: (n,)),
+    'noises.pink_noise': (noises.pink_noise, lambda n: (n,)),
+    'noises.white_noise_filtered': (noises.white_noise_filtered, lambda n: (n, 50, 1 / DT)),
+    'noises.impulse_noise': (noises.impulse_noise, lambda n: (n, 0.1, 5)),
+    'noises.sparse_events': (noises.sparse_events, lambda n: (n, 0.01, 5, 'poisson', 'normal', (1, 4))),
+    'filters.bandpass': (filters.bandpass, lambda n: (_test_signal(n), 100, 150, 1 / DT, 8)),
+    'filters.lowpass[zero_phase]': (filters.lowpass, lambda n: (_test_signal(n), 50, 1 / DT, 5, True)),
+    'filters.fir_filter': (filters.fir_filter,
+                           lambda n: (_test_signal(n), filters.fir_design(1001, 'lowpass', 50, 1 / DT))),
+    'mixing.add_noise': (mixing.add_noise, lambda n: (generators.harmonic_signal(1.0, 0.5, n * DT, DT),
+                                                      [('white', 10.0), ('impulse', 20.0, {'density': 0.01})])),
+    # спектры и отображение
+    'spectra.spectrum[4096]': (spectra.spectrum, lambda n: (_test_signal(n), DT, 4096)),
+    'spectra.spectrum[fast]': (spectra.spectrum, lambda n: (_test_signal(n), DT, None, 'fast')),
+    'spectra.welch': (spectra.welch, lambda n: (_test_signal(n), DT, 256)),
+    'spectra.spectrum[64ch]': (spectra.spectrum,
+                               lambda n: (np.tile(_test_signal(n // CHANNELS), (CHANNELS, 1)), DT, None, 'fast')),
+    'decimation.minmax_decimate': (decimation.minmax_decimate,
+                                   lambda n: (np.arange(n) * DT, _test_signal(n), 1200)),
+}
+
+
+# массивы результата функции: отсчёты сигнала, пары массивов, значения спектра
+def result_arrays(result):
+    if hasattr(result, 'samples'):
+        return [np.asarray(result.samples)]
+    if hasattr(result, 'values'):
+        return [np.asarray(result.values)]
+    if isinstance(result, tuple):
+        return [np.asarray(r) for r in result]
+    return [np.asarray(result)]
@@ -0,0 +1,122 @@
+import argparse
+import os
+import sys
+
+import numpy as np
+
+from cases import CASES, DT, result_arrays, generators, noises, signals, spectra
+from signal_noise_generator import streaming
+import reference
+
+# Проверка численной эквивалентности:
+# 1) векторизованные генераторы против исходных поэлементных реализаций (reference.py);
+# 2) выходы всех функций из cases.py против сохранённых эталонов golden.npz
+#    (python benchmarks/golden.py --update перезаписывает эталоны).
+
+GOLDEN = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'golden.npz')
+SIZE = 2000
+SEED = 12345
+
+
+def _close(a, b):
+    return a.shape == b.shape and np.allclose(a, b, rtol=1e-9, atol=1e-9)
+
+
+# число несовпадающих отсчётов не больше числа фронтов импульсов
+# (исходная реализация с int() сдвигала фронты на отсчёт)
+def _edges_only(a, b, edges):
+    return a.shape == b.shape and np.count_nonzero(a != b) <= edges
+
+
+def reference_checks():
+    checks = {}
+    t, s = reference.triangular_signal(1.5, 0.5, 3, DT)
+    checks['triangular_signal'] = _close(generators.triangular_signal(1.5, 0.5, 3, DT).samples, s)
+    t, s = reference.harmonic_signal(2, 0.5, 3, DT)
+    checks['harmonic_signal'] = _close(generators.harmonic_signal(2, 0.5, 3, DT).samples, s)
+    t, s = reference.polyharmonic_signal(0.5, 3, DT, [1, 0.5, 0.3, 0.2])
+    checks['polyharmonic_signal'] = _close(generators.polyharmonic_signal(0.5, 3, DT, [1, 0.5, 0.3, 0.2]).samples, s)
+    t, s = reference.generate_poliharmonic([1, 2.5, 7], 3, DT)
+    checks['generate_poliharmonic'] = _close(signals.generate_poliharmonic([1, 2.5, 7], 3, DT).samples, s)
+    t, s = reference.generate_poliharmonic(np.arange(1, 101), 3, DT)
+    checks['generate_poliharmonic[100]'] = _close(signals.generate_poliharmonic(np.arange(1, 101), 3, DT).samples, s)
+    # без гармоник - нулевой сигнал нужной формы (прежде ZeroDivisionError при разбиении на блоки)
+    checks['polyharmonic_synthesis[0]'] = all(
+        _close(generators.polyharmonic_synthesis([], 1000, DT, amplitudes=np.empty(shape), method=method),
+               np.zeros(shape[:-1] + (1000,)))
+        for shape in [(0,), (3, 0)] for method in ('auto', 'ifft', 'outer'))
+    t, s = reference.unipolar_pulses(0.3, 6, 3, DT)
+    checks['unipolar_pulses'] = _edges_only(generators.unipolar_pulses(0.3, 6, 3, DT).samples, s, 12)
+    t, s = reference.bipolar_pulses(0.3, 6, 3, DT)
+    checks['bipolar_pulses'] = _edges_only(generators.bipolar_pulses(0.3, 6, 3, DT).samples, s, 12)
+    t, s = reference.generate_bipolar_pulses(3, 0.628, DT)
+    checks['generate_bipolar_pulses'] = _edges_only(signals.generate_bipolar_pulses(3, 0.628, DT).samples, s, 12)
+
+    np.random.seed(SEED)
+    s = reference.impulse_noise(100000, 0.05, 3)
+    np.random.seed(SEED)
+    v = noises.impulse_noise(100000, 0.05, 3)
+    # порядок обращений к генератору случайных чисел другой: сравниваются свойства, а не отсчёты
+    checks['impulse_noise'] = (set(np.unique(v)) <= {-3.0, 0.0, 3.0}
+                               and abs(np.count_nonzero(v) - np.count_nonzero(s)) < 0.01 * len(s))
+
+    # потоковый импульсный шум: около size * density событий при любом размере блока, как и в массиве
+    # целиком (совпадающие номера событий сливаются, поэтому допуск 10%)
+    checks['iter_impulse_noise'] = all(
+        abs(sum(np.count_nonzero(s) for _, s in streaming.iter_impulse_noise(size, density, block_size=block))
+            - size * density) <= 0.1 * size * density
+        and abs(np.count_nonzero(noises.impulse_noise(size, density)) - size * density) <= 0.1 * size * density
+        for size, density, block in [(10 ** 7, 1e-5, streaming.BLOCK_SIZE), (100000, 0.1, 7), (100000, 0.05, 1000)])
+
+    x = np.random.normal(size=3000)
+    freq, values = reference.spectrum(x, DT, 1024)
+    spec = spectra.spectrum(x, DT, 1024)
+    checks['spectrum'] = _close(spec.freq[:-1], freq) and np.allclose(spec.values[:-1], values)
+
+    # многоканальный режим: строки совпадают с поканальными вызовами
+    shifts = np.linspace(0, np.pi, 8)
+    channels = signals.generate_harmonic(5.0, 3, DT, shifts).samples
+    rows = [signals.generate_harmonic(5.0, 3, DT, shift).samples for shift in shifts]
+    checks['generate_harmonic[channels]'] = all(_close(a, b) for a, b in zip(channels, rows))
+    spec = spectra.spectrum(channels, DT, 1000, 'fast', 'hann')
+    checks['spectrum[channels]'] = all(np.allclose(a, spectra.spectrum(b, DT, 1000, 'fast', 'hann').values)
+                                       for a, b in zip(spec.values, rows))
+    psd = spectra.welch(channels, DT, 256)[1]
+    checks['welch[channels]'] = all(np.allclose(a, spectra.welch(b, DT, 256)[1]) for a, b in zip(psd, rows))
+    return checks
+
+
+def golden_outputs():
+    outputs = {}
+    for name, (function, arguments) in CASES.items():
+        np.random.seed(SEED)
+        for i, a in enumerate(result_arrays(function(*arguments(SIZE)))):
+            outputs[f'{name}/{i}'] = a
+    return outputs
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Проверка численной эквивалентности генераторов')
+    parser.add_argument('--update', action='store_true', help='перезаписать эталонные выходы')
+    args = parser.parse_args(argv)
+
+    failed = [name for name, ok in reference_checks().items() if not ok]
+    outputs = golden_outputs()
+    if args.update:
+        np.savez_compressed(GOLDEN, **outputs)
+        print(f'Эталоны сохранены: {GOLDEN} ({len(outputs)} массивов)')
+    else:
+        golden = np.load(GOLDEN)
+        for key, value in outputs.items():
+            if key not in golden or not _close(value, golden[key]):
+                failed.append(key)
+        missing = sorted(set(golden.files) - set(outputs))
+        failed.extend(f'{key} (нет в cases.py)' for key in missing)
+    for name in failed:
+        print(f'ОТЛИЧАЕТСЯ: {name}')
+    print('Проверки пройдены' if not failed else f'Не пройдено проверок: {len(failed)}')
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
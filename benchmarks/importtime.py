@@ -0,0 +1,62 @@
+import argparse
+import os
+import subprocess
+import sys
+
+# Время импорта модулей (python -X importtime в отдельном процессе) и проверка, что тяжёлые
+# зависимости не загружаются при импорте: matplotlib нужен только для plot_signals,
+# scipy - для фильтрации, plotly.io и Kaleido - для экспорта изображений.
+#   python benchmarks/importtime.py
+#   python benchmarks/importtime.py --repeat 5 --filter noises
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+HEAVY = ('matplotlib', 'scipy', 'plotly.io', 'kaleido')
+
+MODULES = ('signal_noise_generator.signal_generator.signals', 'signal_noise_generator.noise_generator.noises',
+           'signal_noise_generator.spectrum.spectra', 'signal_noise_generator.streaming',
+           'signal_noise_generator.storage', 'signal_noise_generator.service', 'signal_noise_generator.__main__',
+           'signals', 'sweep', 'decimation', 'cache', 'export')
+
+
+# время импорта (мкс, с учётом вложенных импортов) и имена всех загруженных модулей
+def import_time(module):
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', f'import {module}'], cwd=ROOT,
+                            capture_output=True, text=True, check=True)
+    total, loaded = None, set()
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        name = name.strip()
+        loaded.add(name)
+        if name == module:
+            total = int(cumulative)
+    return total, loaded
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Время импорта модулей и загрузка тяжёлых зависимостей')
+    parser.add_argument('--repeat', type=int, default=3, help='число запусков (берётся лучшее время)')
+    parser.add_argument('--filter', default='', help='только модули, в имени которых есть подстрока')
+    args = parser.parse_args(argv)
+
+    failed = []
+    print(f'{"модуль":<50} {"время (мс)":>10}  тяжёлые зависимости')
+    for module in MODULES:
+        if args.filter not in module:
+            continue
+        times = []
+        for _ in range(args.repeat):
+            total, loaded = import_time(module)
+            times.append(total)
+        heavy = sorted(h for h in HEAVY if any(name == h or name.startswith(h + '.') for name in loaded))
+        print(f'{module:<50} {min(times) / 1e3:>10.1f}  {", ".join(heavy) or "-"}')
+        if heavy:
+            failed.append(module)
+    for module in failed:
+        print(f'ЛИШНИЕ ИМПОРТЫ: {module}')
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,84 @@
+import numpy as np
+
+# Исходные (поэлементные) реализации генераторов до векторизации. Используются только
+# для проверки, что векторизованные версии дают те же отсчёты (golden.py).
+
+
+def triangular_signal(A, T, T_N, delta_t):
+    t = np.arange(0, T_N, delta_t)
+    s = np.zeros_like(t)
+    for i, time in enumerate(t):
+        phase = (time % T) / T
+        if phase < 0.5:
+            s[i] = 4 * A * phase
+        else:
+            s[i] = 4 * A * (1 - phase)
+    return t, s
+
+
+def harmonic_signal(A, T, T_N, delta_t):
+    t = np.arange(0, T_N, delta_t)
+    s = A * np.sin((2 * np.pi / T) * t)
+    return t, s
+
+
+def polyharmonic_signal(T, T_N, delta_t, A_list):
+    t = np.arange(0, T_N, delta_t)
+    s = np.zeros_like(t)
+    for i, A in enumerate(A_list, start=1):
+        s += A * np.sin((2 * np.pi * i / T) * t)
+    return t, s
+
+
+def generate_poliharmonic(frequencies, duration, step):
+    t = np.arange(0.0, duration + 0.001, step)
+    signal = sum(np.sin(2 * np.pi * f * t) for f in frequencies)
+    return t, signal
+
+
+def unipolar_pulses(T, n, T_N, delta_t):
+    t = np.arange(0, T_N, delta_t)
+    s = np.zeros_like(t)
+    for i in range(n):
+        start = int(i * T / delta_t)
+        end = int((i + 1) * T / delta_t)
+        s[start:end] = 1
+    return t, s
+
+
+def bipolar_pulses(T, n, T_N, delta_t):
+    t = np.arange(0, T_N, delta_t)
+    s = np.zeros_like(t)
+    for i in range(n):
+        start = int(i * T / delta_t)
+        end = int((i + 1) * T / delta_t)
+        s[start:end] = 1 if i % 2 == 0 else -1
+    return t, s
+
+
+def generate_bipolar_pulses(signal_duration, pulse_duration, step):
+    t = np.arange(0.0, signal_duration, step)
+    signal = np.empty_like(t)
+    for pulse_num in range(int(signal_duration / pulse_duration) + 1):
+        start = int(pulse_num * pulse_duration / step)
+        end_pulse = int(start + pulse_duration / 2 / step)
+        end = int(start + pulse_duration / step) + 1
+        signal[start:end_pulse] = 1
+        signal[end_pulse:end] = -1
+    return t, signal
+
+
+def impulse_noise(size, density=0.1, magnitude=5):
+    noise = np.zeros(size)
+    num_impulses = int(size * density)
+    for _ in range(num_impulses):
+        index = np.random.randint(0, size)
+        noise[index] = np.random.choice([magnitude, -magnitude])
+    return noise
+
+
+def spectrum(signal, delta_t, n):
+    fft_val = np.fft.fft(signal, n=n)
+    fft_freq = np.fft.fftfreq(n, delta_t)
+    indexes = fft_freq >= 0
+    return fft_freq[indexes], fft_val[indexes]
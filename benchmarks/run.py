@@ -0,0 +1,84 @@
+import argparse
+import json
+import os
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+
+from cases import CASES
+
+# Замеры времени и пиковой памяти для всех функций из cases.py на сигналах от 1e3 до 1e8
+# отсчётов и сравнение с сохранённым базовым замером baseline.json.
+#   python benchmarks/run.py                     # размеры до 1e6, сравнение с baseline.json
+#   python benchmarks/run.py --max-size 1e8      # все размеры (нужно несколько ГБ памяти)
+#   python benchmarks/run.py --save-baseline     # сохранить текущие замеры как базовые (--filter - только часть)
+
+BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'baseline.json')
+SIZES = (10 ** 3, 10 ** 4, 10 ** 5, 10 ** 6, 10 ** 7, 10 ** 8)
+MIN_TIME = 1e-2  # замеры быстрее 10 мс не считаются регрессией: слишком велик разброс
+
+
+def measure(function, arguments, size, repeat=3):
+    args = arguments(size)
+    number = max(1, min(10, 10 ** 6 // size))
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(number):
+            function(*args)
+        best = min(best, (time.perf_counter() - start) / number)
+    # память отдельным запуском: tracemalloc замедляет выполнение
+    tracemalloc.start()
+    function(*args)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return best, peak
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Замеры генераторов сигналов, шумов и спектров')
+    parser.add_argument('--max-size', type=float, default=1e6, help='наибольшее число отсчётов')
+    parser.add_argument('--filter', default='', help='только функции, в имени которых есть подстрока')
+    parser.add_argument('--baseline', default=BASELINE)
+    parser.add_argument('--save-baseline', action='store_true')
+    parser.add_argument('--threshold', type=float, default=1.5, help='допустимое замедление относительно базы')
+    args = parser.parse_args(argv)
+
+    baseline = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+
+    results, regressions = {}, []
+    print(f'{"функция":<40} {"отсчётов":>10} {"время (мс)":>12} {"память (МБ)":>12} {"к базе":>8}')
+    for name, (function, arguments) in CASES.items():
+        if args.filter not in name:
+            continue
+        for size in SIZES:
+            if size > args.max_size:
+                break
+            np.random.seed(0)
+            elapsed, peak = measure(function, arguments, size)
+            key = f'{name}@{size}'
+            results[key] = {'time': elapsed, 'peak': peak}
+            ratio = ''
+            if key in baseline and not args.save_baseline:
+                ratio = elapsed / baseline[key]['time']
+                if ratio > args.threshold and elapsed > MIN_TIME:
+                    regressions.append(key)
+                ratio = f'{ratio:.2f}'
+            print(f'{name:<40} {size:>10} {elapsed * 1e3:>12.3f} {peak / 2 ** 20:>12.2f} {ratio:>8}')
+
+    if args.save_baseline:  # замеры других функций и размеров в базе сохраняются
+        with open(args.baseline, 'w') as f:
+            json.dump(dict(baseline, **results), f, indent=1, sort_keys=True)
+        print(f'Базовые замеры сохранены: {args.baseline}')
+    for key in regressions:
+        print(f'МЕДЛЕННЕЕ БАЗЫ: {key}')
+    return 1 if regressions else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
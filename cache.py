@@ -0,0 +1,209 @@
+import hashlib
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+import decimation
+import profiling
+import signals
+from signal_noise_generator.sampled import Signal
+from signal_noise_generator.spectrum import spectra
+
+
+# размер элемента кэша в байтах
+def _sizeof(value):
+    if isinstance(value, (bytes, bytearray)):
+        return len(value)
+    if isinstance(value, (tuple, list)):
+        return sum(_sizeof(v) for v in value)
+    return getattr(value, 'nbytes', 64)
+
+
+# запрет изменения закэшированных массивов
+def _freeze(value):
+    if isinstance(value, np.ndarray):
+        value.setflags(write=False)
+    elif isinstance(value, Signal):
+        value.samples.setflags(write=False)
+    elif isinstance(value, (tuple, list)):
+        for v in value:
+            _freeze(v)
+    return value
+
+
+# ключ по содержимому; массивы numpy хэшируются по типу, форме и всем байтам
+# (repr сокращает массивы длиннее 1000 элементов, и разные массивы давали один ключ)
+def _update(digest, part):
+    if isinstance(part, np.ndarray) and part.dtype != object:
+        digest.update(f'ndarray({part.dtype.str},{part.shape})'.encode())
+        digest.update(np.ascontiguousarray(part))
+    elif isinstance(part, (tuple, list)):
+        digest.update(b'(' if isinstance(part, tuple) else b'[')
+        for item in part:
+            _update(digest, item)
+            digest.update(b',')
+        digest.update(b')' if isinstance(part, tuple) else b']')
+    else:
+        digest.update(repr(part).encode())
+
+
+def make_key(*parts):
+    digest = hashlib.sha1()
+    _update(digest, parts)
+    return digest.hexdigest()
+
+
+class LRUCache:
+    def __init__(self, max_bytes=256 * 2 ** 20, max_entries=256):
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+        self.nbytes = 0
+        self.hits = 0
+        self.misses = 0
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __contains__(self, key):
+        return key in self._data
+
+    def __len__(self):
+        return len(self._data)
+
+    def get(self, key, default=None):
+        with self._lock:
+            if key not in self._data:
+                self.misses += 1
+                return default
+            self.hits += 1
+            self._data.move_to_end(key)
+            return self._data[key][0]
+
+    def put(self, key, value):
+        size = _sizeof(value)
+        with self._lock:
+            if key in self._data:
+                self.nbytes -= self._data.pop(key)[1]
+            if size > self.max_bytes:  # слишком большой элемент не кэшируем
+                return value
+            self._data[key] = (value, size)
+            self.nbytes += size
+            # вытеснение давно не использованных элементов
+            while self.nbytes > self.max_bytes or len(self._data) > self.max_entries:
+                self.nbytes -= self._data.popitem(last=False)[1][1]
+        return value
+
+    def get_or_compute(self, key, compute):
+        value = self.get(key, self)
+        if value is self:
+            value = self.put(key, _freeze(compute()))
+        return value
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self.nbytes = 0
+
+
+# вычисление при промахе кэша (отдельный этап в профиле запуска)
+def _compute(name, function, *args, **kwargs):
+    with profiling.stage(name) as stage:
+        return stage.set(function(*args, **kwargs))
+
+
+# общий кэш процесса (разделяется между сессиями streamlit)
+_cache = LRUCache()
+
+
+# (ключ, значение) из кэша без вычисления или None при промахе: сценарий проверяет кэш сам,
+# не отправляя задание в пул потоков
+def cached(key):
+    value = _cache.get(key)
+    return None if value is None else (key, value)
+
+
+# ключи результатов: по ним же проверяется кэш до отправки задания
+def signal_key(name, *params):
+    return make_key('signal', name, params)
+
+
+def spectrum_key(signal_key, step, bpf, policy='truncate', window_name=None):
+    return make_key('spectrum', signal_key, step, bpf, policy, window_name)
+
+
+def welch_key(signal_key, step, nperseg, noverlap, window_name):
+    return make_key('welch', signal_key, step, nperseg, noverlap, window_name)
+
+
+def spectrogram_key(signal_key, step, nperseg, noverlap, window_name, average=1):
+    return make_key('spectrogram', signal_key, step, nperseg, noverlap, window_name, average)
+
+
+def indices_key(signal_key, width):
+    return make_key('indices', signal_key, width)
+
+
+# сигнал (signal_noise_generator.sampled.Signal): ключ по имени генератора и его параметрам
+def signal(name, *params):
+    key = signal_key(name, *params)
+    return key, _cache.get_or_compute(key, lambda: _compute(name, getattr(signals, name), *params))
+
+
+# номера отображаемых отсчётов каждого канала (прореживание по ширине графика)
+def indices(signal_key, samples, width):
+    return _cache.get_or_compute(indices_key(signal_key, width), lambda: _compute(
+        'decimation.channel_indices', decimation.channel_indices, samples, width))
+
+
+# спектр сигнала: ключ по сигналу, числу точек БПФ, способу выбора длины и окну
+def spectrum(signal_key, signal, step, bpf, policy='truncate', window_name=None):
+    key = spectrum_key(signal_key, step, bpf, policy, window_name)
+    return key, _cache.get_or_compute(key, lambda: _compute('spectra.spectrum', spectra.spectrum, signal, step, bpf,
+                                                            policy, window_name))
+
+
+# усреднённый спектр (Уэлч) и спектрограмма: ключ по сигналу и параметрам сегментов
+def welch(signal_key, signal, step, nperseg, noverlap, window_name):
+    key = welch_key(signal_key, step, nperseg, noverlap, window_name)
+    return key, _cache.get_or_compute(key, lambda: _compute('spectra.welch', spectra.welch, signal, step, nperseg,
+                                                            noverlap, window_name))
+
+
+def spectrogram(signal_key, signal, step, nperseg, noverlap, window_name, average=1):
+    key = spectrogram_key(signal_key, step, nperseg, noverlap, window_name, average)
+    return key, _cache.get_or_compute(key, lambda: _compute('spectra.spectrogram', spectra.spectrogram, signal, step,
+                                                            nperseg, noverlap, window_name, average))
+
+
+# проекция спектра (вещественный, мнимый, ...) для выбранного вида
+def projection(spectrum_key, spectrum, compute):
+    return _cache.get_or_compute(make_key('projection', spectrum_key, spectrum), compute)
+
+
+# JPEG-изображение графика (plotly.io и Kaleido загружаются при первом экспорте)
+def image(key, fig, width, height):
+    import plotly.io as pio
+
+    return _cache.get_or_compute(make_key('image', key, width, height),
+                                 lambda: _compute('Kaleido to_image', pio.to_image, fig, format='jpg', width=width,
+                                                  height=height))
+
+
+# несколько JPEG-изображений: недостающие формируются за один сеанс Kaleido
+def images(keys, figs, width, height):
+    import plotly.io as pio
+
+    keys = [make_key('image', key, width, height) for key in keys]
+    result = [_cache.get(key) for key in keys]
+    missing = [i for i, image in enumerate(result) if image is None]
+    if missing:
+        with tempfile.TemporaryDirectory() as tmp:
+            paths = [os.path.join(tmp, f'{i}.jpg') for i in missing]
+            with profiling.stage('Kaleido write_images'):
+                pio.write_images([figs[i] for i in missing], paths, format='jpg', width=width, height=height)
+            for i, path in zip(missing, paths):
+                with open(path, 'rb') as f:
+                    result[i] = _cache.put(keys[i], f.read())
+    return result
@@ -0,0 +1,29 @@
+import numpy as np
+
+
+# индексы минимума и максимума в каждой из buckets групп (по одной группе на пиксель)
+def minmax_indices(y, buckets):
+    y = np.asarray(y)
+    n = len(y)
+    if n <= 2 * buckets:
+        return np.arange(n)
+    size = -(-n // buckets)  # округление вверх
+    count = -(-n // size)
+    padded = np.pad(y, (0, count * size - n), mode='edge').reshape(count, size)
+    offsets = np.arange(count) * size
+    i_min = np.minimum(padded.argmin(axis=1) + offsets, n - 1)
+    i_max = np.minimum(padded.argmax(axis=1) + offsets, n - 1)
+    # порядок точек внутри группы сохраняется, первая и последняя точки всегда остаются
+    indexes = np.sort(np.stack((i_min, i_max), axis=1), axis=1).ravel()
+    return np.unique(np.concatenate(([0], indexes, [n - 1])))
+
+
+# прореживание сигнала до размера графика с сохранением пиков
+def minmax_decimate(x, y, buckets):
+    indexes = minmax_indices(y, buckets)
+    return np.asarray(x)[indexes], np.asarray(y)[indexes]
+
+
+# индексы отображаемых отсчётов для каждого канала сигнала формы (каналы, отсчёты) или одного канала
+def channel_indices(samples, buckets):
+    return [minmax_indices(row, buckets) for row in np.atleast_2d(samples)]
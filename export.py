@@ -0,0 +1,34 @@
+import io
+import zipfile
+
+import cache
+import profiling
+from signal_noise_generator import storage
+
+
+# отложенное формирование JPEG: вызывается streamlit только при скачивании
+def lazy_image(key, fig, width, height):
+    return profiling.deferred(lambda: cache.image(key, fig, width, height), 'Экспорт JPEG')
+
+
+# архив из нескольких изображений
+def zip_images(keys, figs, names, width, height):
+    images = cache.images(keys, figs, width, height)
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, 'w', zipfile.ZIP_STORED) as archive:  # JPEG уже сжат
+        for name, image in zip(names, images):
+            archive.writestr(name, image)
+    return buffer.getvalue()
+
+
+# отсчёты сигнала и спектр в двоичном формате signal_noise_generator.storage
+def signal_bytes(sig):
+    buffer = io.BytesIO()
+    storage.save(buffer, sig)
+    return buffer.getvalue()
+
+
+def spectrum_bytes(spec):
+    buffer = io.BytesIO()
+    storage.write_spectrum(buffer, spec)
+    return buffer.getvalue()
@@ -0,0 +1,190 @@
+import cProfile
+import io
+import json
+import marshal
+import pstats
+import threading
+import time
+from functools import wraps
+
+# Замеры времени этапов одного запуска сценария (генерация, БПФ, построение графиков, Kaleido,
+# передача графика в streamlit) с числом отсчётов и объёмом результата.
+# Запуск профилирования привязан к потоку: пока start() не вызван, stage() возвращает
+# общий пустой этап, а timed() сразу вызывает функцию, то есть замеры ничего не стоят.
+
+_local = threading.local()
+
+
+# число отсчётов и размер в байтах результата этапа
+def _describe(value):
+    if isinstance(value, (bytes, bytearray)):
+        return None, len(value)
+    if isinstance(value, (tuple, list)):
+        parts = [_describe(v) for v in value]
+        samples = [p[0] for p in parts if p[0] is not None]
+        return (max(samples) if samples else None), sum(p[1] or 0 for p in parts)
+    if hasattr(value, 'samples'):  # Signal
+        return value.samples.size, value.nbytes
+    if hasattr(value, 'values') and hasattr(value, 'nbytes'):  # Spectrum
+        return value.values.size, value.nbytes
+    if hasattr(value, 'nbytes'):
+        return getattr(value, 'size', None), value.nbytes
+    return None, None
+
+
+class Stage:
+    def __init__(self, run, name):
+        self.run = run
+        self.name = name
+        self.depth = 0
+        self.seconds = 0.0
+        self.samples = None
+        self.nbytes = None
+        self._start = 0.0
+
+    # результат этапа (для числа отсчётов и объёма); возвращает значение без изменений
+    def set(self, value):
+        self.samples, self.nbytes = _describe(value)
+        return value
+
+    def __enter__(self):
+        self.depth = self.run.depth
+        self.run.depth += 1
+        self.run.stages.append(self)
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.seconds = time.perf_counter() - self._start
+        self.run.depth -= 1
+
+    def as_dict(self):
+        return {'stage': self.name, 'depth': self.depth, 'seconds': self.seconds, 'samples': self.samples,
+                'bytes': self.nbytes}
+
+
+class _NullStage:
+    def set(self, value):
+        return value
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        pass
+
+
+_NULL_STAGE = _NullStage()
+
+
+class Run:
+    def __init__(self, log=None, profile=False):
+        self.stages = []
+        self.deferred = []  # этапы, выполненные позже (скачивание изображений)
+        self.depth = 0
+        self.log = log
+        self.started = time.time()
+        self.seconds = 0.0
+        self.profiler = cProfile.Profile() if profile else None
+        self.profile_error = None  # почему cProfile не запущен
+        self._start = time.perf_counter()
+
+    def stage(self, name):
+        return Stage(self, name)
+
+    def rows(self):
+        return [s.as_dict() for s in self.stages]
+
+    # статистика cProfile: текст первых строк и двоичный дамп (формат pstats)
+    def profile_text(self, lines=30):
+        buffer = io.StringIO()
+        pstats.Stats(self.profiler, stream=buffer).sort_stats('cumulative').print_stats(lines)
+        return buffer.getvalue()
+
+    def profile_dump(self):
+        self.profiler.create_stats()
+        return marshal.dumps(self.profiler.stats)
+
+    def _write(self, record):
+        if self.log:
+            with open(self.log, 'a', encoding='utf-8') as f:
+                f.write(json.dumps(record, ensure_ascii=False) + '\n')
+
+
+def current():
+    return getattr(_local, 'run', None)
+
+
+# начало запуска сценария в текущем потоке (незавершённый предыдущий запуск отбрасывается)
+def start(log=None, profile=False):
+    stale = current()
+    if stale is not None and stale.profiler is not None:
+        stale.profiler.disable()
+    run = _local.run = Run(log, profile)
+    if run.profiler is not None:
+        # с Python 3.12 cProfile работает через общий для процесса sys.monitoring: пока профилируется
+        # другой сеанс, enable() отказывает, и запуск продолжается без cProfile
+        try:
+            run.profiler.enable()
+        except ValueError as e:
+            run.profiler = None
+            run.profile_error = str(e)
+    return run
+
+
+def finish():
+    run = current()
+    if run is None:
+        return None
+    if run.profiler is not None:
+        run.profiler.disable()
+    run.seconds = time.perf_counter() - run._start
+    _local.run = None
+    run._write({'time': run.started, 'seconds': run.seconds, 'stages': run.rows()})
+    return run
+
+
+def stage(name):
+    run = current()
+    return _NULL_STAGE if run is None else run.stage(name)
+
+
+# декоратор: вызов функции как этап текущего запуска
+def timed(name=None):
+    def decorator(function):
+        label = name or function.__name__
+
+        @wraps(function)
+        def wrapper(*args, **kwargs):
+            run = current()
+            if run is None:
+                return function(*args, **kwargs)
+            with run.stage(label) as s:
+                return s.set(function(*args, **kwargs))
+
+        return wrapper
+
+    return decorator
+
+
+# отложенный вызов (например, data кнопки скачивания) замеряется как этап запуска,
+# в котором был создан; без профилирования функция возвращается как есть
+def deferred(function, name):
+    run = current()
+    if run is None:
+        return function
+
+    def call():
+        # вложенные этапы собираются отдельно от уже завершённого запуска
+        sub = Run()
+        previous, _local.run = current(), sub
+        try:
+            with sub.stage(name) as s:
+                result = s.set(function())
+        finally:
+            _local.run = previous
+        run.deferred.extend(sub.stages)
+        run._write({'time': sub.started, 'deferred': sub.rows()})
+        return result
+
+    return call
@@ -0,0 +1,95 @@
+import argparse
+import json
+import sys
+
+from signal_noise_generator import service
+
+# Командная строка:
+#   python -m signal_noise_generator list
+#   python -m signal_noise_generator run harmonic_signal A=1 T=0.5 T_N=10 delta_t=0.001 -o harmonic.sig
+#   python -m signal_noise_generator run welch nperseg=512 --signal harmonic.sig -o welch.bin
+#   python -m signal_noise_generator batch requests.json -o results.bin   (- вместо файла: stdin/stdout)
+#   python -m signal_noise_generator serve --port 8750
+
+
+# значение аргумента: JSON (числа, списки, null) или строка
+def _parse_value(text):
+    try:
+        return json.loads(text)
+    except ValueError:
+        return text
+
+
+# аргументы ИМЯ=ЗНАЧЕНИЕ в словарь
+def _arguments(items):
+    arguments = {}
+    for item in items:
+        name, sep, text = item.partition('=')
+        if not sep:
+            raise ValueError(f'аргумент {item!r} не в виде ИМЯ=ЗНАЧЕНИЕ')
+        arguments[name] = _parse_value(text)
+    return arguments
+
+
+def _output(path):
+    return sys.stdout.buffer if path == '-' else open(path, 'wb')
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m signal_noise_generator',
+                                     description='Генераторы сигналов, шумов и спектров без интерфейса')
+    commands = parser.add_subparsers(dest='command', required=True)
+    commands.add_parser('list', help='функции и их параметры')
+    run = commands.add_parser('run', help='один вызов функции')
+    run.add_argument('function')
+    run.add_argument('args', nargs='*', metavar='ИМЯ=ЗНАЧЕНИЕ')
+    run.add_argument('--signal', help='файл .sig со входным сигналом (для спектров)')
+    run.add_argument('--seed', type=int)
+    run.add_argument('--dtype', default='float32', help='тип отсчётов в результате')
+    run.add_argument('-o', '--output', default='-')
+    batch = commands.add_parser('batch', help='пакет запросов JSON (список словарей)')
+    batch.add_argument('requests', help='файл JSON или - для stdin')
+    batch.add_argument('-o', '--output', default='-')
+    serve = commands.add_parser('serve', help='локальный HTTP-сервер (POST /batch, GET /functions)')
+    serve.add_argument('--host', default='127.0.0.1')
+    serve.add_argument('--port', type=int, default=8750)
+    args = parser.parse_args(argv)
+
+    if args.command == 'list':
+        for name, signature in service.describe().items():
+            print(f'{name}{signature}')
+    elif args.command == 'run':
+        # ошибки разбора аргументов и вызова - сообщение и код возврата, а не трассировка или запись в файл
+        try:
+            request = {'function': args.function, 'dtype': args.dtype, 'args': _arguments(args.args)}
+            if args.signal is not None:
+                request['signal'] = args.signal
+            if args.seed is not None:
+                request['seed'] = args.seed
+            result = service.execute(request)
+            out = _output(args.output)
+        except (ValueError, TypeError, OSError) as e:
+            print(f'{args.function}: {e}', file=sys.stderr)
+            sys.exit(1)
+        service.write_result(out, args.function, result, args.dtype)
+        out.flush()
+    elif args.command == 'batch':
+        # нет файла, неверный JSON (JSONDecodeError - подкласс ValueError), не список запросов
+        # или не открывается файл результата
+        try:
+            source = sys.stdin if args.requests == '-' else open(args.requests, encoding='utf-8')
+            with source:
+                requests = service.requests_list(json.load(source))
+            out = _output(args.output)
+        except (ValueError, OSError) as e:
+            print(f'{args.requests}: {e}', file=sys.stderr)
+            sys.exit(1)
+        service.run_batch(requests, out)
+        out.flush()
+    else:
+        print(f'http://{args.host}:{args.port}: POST /batch, GET /functions', file=sys.stderr)
+        service.serve(args.host, args.port)
+
+
+if __name__ == '__main__':
+    main()
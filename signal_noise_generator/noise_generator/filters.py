@@ -0,0 +1,100 @@
+from functools import lru_cache
+
+import numpy as np
+
+# Фильтрация Баттерворта в форме каскада звеньев второго порядка (SOS): в отличие от формы
+# (b, a) она устойчива при больших порядках и низких частотах среза. Расчёт фильтра кэшируется
+# по (вид, порядок, частота среза, частота дискретизации), повторные вызовы с теми же
+# параметрами его не повторяют. Для длинных КИХ-фильтров - свёртка перекрытием с суммированием
+# через БПФ. scipy.signal импортируется при первом расчёте.
+
+KINDS = ('lowpass', 'highpass', 'bandpass', 'bandstop')
+FIR_DIRECT = 64  # КИХ-фильтры короче этого считаются прямой свёрткой
+
+
+# частота среза как ключ кэша: число или пара (нижняя, верхняя) для полосовых фильтров
+def _cutoff(kind, cutoff):
+    if kind in ('bandpass', 'bandstop'):
+        low, high = cutoff
+        return float(low), float(high)
+    if kind not in KINDS:
+        raise ValueError(f'Неизвестный вид фильтра: {kind}')
+    return float(cutoff)
+
+
+@lru_cache(maxsize=256)
+def _butter(kind, order, cutoff, fs):
+    from scipy.signal import butter
+
+    sos = butter(order, cutoff, btype=kind, fs=fs, output='sos')
+    sos.setflags(write=False)
+    return sos
+
+
+# коэффициенты фильтра Баттерворта (SOS). Закэшированный массив закрыт для записи, а вызывающему
+# возвращается его копия (несколько звеньев по 6 чисел): sosfilt требует записываемый массив
+def design(kind, cutoff, fs, order=5):
+    return _butter(kind, int(order), _cutoff(kind, cutoff), float(fs)).copy()
+
+
+# начальное состояние для фильтрации блоками (sosfilt(..., zi=zi))
+def initial_state(sos, shape=()):
+    return np.zeros((len(sos),) + tuple(shape) + (2,))
+
+
+# фильтрация вдоль axis; zero_phase - прямой и обратный проход (sosfiltfilt) без фазового сдвига
+def apply(data, kind, cutoff, fs, order=5, zero_phase=False, axis=-1):
+    from scipy.signal import sosfilt, sosfiltfilt
+
+    sos = design(kind, cutoff, fs, order)
+    if zero_phase:
+        return sosfiltfilt(sos, data, axis=axis)
+    return sosfilt(sos, data, axis=axis)
+
+
+def lowpass(data, cutoff, fs, order=5, zero_phase=False, axis=-1):
+    return apply(data, 'lowpass', cutoff, fs, order, zero_phase, axis)
+
+
+def highpass(data, cutoff, fs, order=5, zero_phase=False, axis=-1):
+    return apply(data, 'highpass', cutoff, fs, order, zero_phase, axis)
+
+
+def bandpass(data, low, high, fs, order=5, zero_phase=False, axis=-1):
+    return apply(data, 'bandpass', (low, high), fs, order, zero_phase, axis)
+
+
+def bandstop(data, low, high, fs, order=5, zero_phase=False, axis=-1):
+    return apply(data, 'bandstop', (low, high), fs, order, zero_phase, axis)
+
+
+@lru_cache(maxsize=256)
+def _firwin(numtaps, kind, cutoff, fs, window):
+    from scipy.signal import firwin
+
+    taps = firwin(numtaps, cutoff, window=window, pass_zero=kind, fs=fs)
+    taps.setflags(write=False)
+    return taps
+
+
+# КИХ-фильтр с окном (нечётное numtaps для фильтров верхних частот и режекторных)
+def fir_design(numtaps, kind, cutoff, fs, window='hamming'):
+    return _firwin(int(numtaps), kind, _cutoff(kind, cutoff), float(fs), window)
+
+
+# КИХ-фильтрация: короткий фильтр - прямая свёртка, длинный - перекрытие с суммированием
+# через БПФ (scipy.signal.oaconvolve). Результат той же длины, что data; compensate_delay
+# убирает задержку (numtaps - 1) / 2 отсчётов линейно-фазового фильтра
+def fir_filter(data, taps, axis=-1, compensate_delay=False):
+    from scipy.signal import lfilter, oaconvolve
+
+    data = np.asarray(data)
+    n, numtaps = data.shape[axis], len(taps)
+    if numtaps < FIR_DIRECT and not compensate_delay:
+        return lfilter(taps, 1.0, data, axis=axis)
+    shape = [1] * data.ndim
+    shape[axis] = numtaps
+    kernel = np.reshape(taps, shape)
+    full = oaconvolve(data, kernel, mode='full', axes=axis)
+    start = (numtaps - 1) // 2 if compensate_delay else 0
+    return np.take(full, np.arange(start, start + n), axis=axis)
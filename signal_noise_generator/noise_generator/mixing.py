@@ -0,0 +1,103 @@
+import numpy as np
+
+from signal_noise_generator.noise_generator import filters
+from signal_noise_generator.noise_generator.noises import PINK_A, PINK_B, sparse_events
+from signal_noise_generator.sampled import Signal
+
+# Сигнал + шум с заданным отношением сигнал/шум (дБ). Шум формируется в рабочем буфере,
+# масштабируется и добавляется к результату ufunc-операциями с out=, без промежуточных
+# массивов для шума, множителя и суммы. Буферы можно передать заранее и использовать повторно.
+# Шум задаётся кортежем (вид, ОСШ в дБ) или (вид, ОСШ, параметры):
+#   'white'; 'pink'; 'filtered' - белый шум через фильтр Баттерворта, параметры cutoff (Гц, для
+#   полосовых - пара), order и kind (вид фильтра из filters.KINDS, по умолчанию 'lowpass');
+#   'impulse' - параметры signal_noise_generator.noise_generator.noises.sparse_events.
+# Сигнал формы (каналы, отсчёты) зашумляется целиком, мощность и ОСШ считаются по каждому каналу.
+
+NOISES = ('white', 'pink', 'filtered', 'impulse')
+
+
+# генератор случайных чисел для out=: по умолчанию берётся из общего состояния np.random,
+# поэтому np.random.seed по-прежнему задаёт результат. Для воспроизводимости при расчётах
+# в нескольких потоках передаётся свой генератор (rng), общее состояние тогда не используется
+def _rng(rng):
+    if rng is None:
+        return np.random.default_rng(np.random.randint(2 ** 32, dtype=np.uint64))
+    if isinstance(rng, np.random.Generator):
+        return rng
+    return np.random.default_rng(rng)
+
+
+def _normal(rng, out):
+    if out.dtype in (np.float32, np.float64) and out.flags.c_contiguous:
+        return rng.standard_normal(out=out, dtype=out.dtype)
+    out[...] = rng.standard_normal(out.shape)
+    return out
+
+
+# шум вида kind в буфер out (значения перезаписываются); fs - частота дискретизации (Гц)
+def fill_noise(kind, out, fs=1.0, rng=None, **params):
+    rng = _rng(rng)
+    if kind == 'white':
+        _normal(rng, out)
+    elif kind == 'pink':
+        from scipy.signal import lfilter
+
+        out[...] = lfilter(PINK_B, PINK_A, _normal(rng, out))
+    elif kind == 'filtered':
+        out[...] = filters.apply(_normal(rng, out), params.get('kind', 'lowpass'), params.get('cutoff', fs / 4), fs,
+                                 params.get('order', 5))
+    elif kind == 'impulse':
+        out.fill(0)
+        indices, values = sparse_events(out.size, rng=rng, **params)
+        np.add.at(out, np.unravel_index(indices, out.shape), values)
+    else:
+        raise ValueError(f'Неизвестный вид шума: {kind}')
+    return out
+
+
+# средняя мощность без временного массива квадратов; для нескольких каналов - столбец (каналы, 1)
+def power(values):
+    if values.ndim == 1:
+        return float(np.dot(values, values)) / max(len(values), 1)
+    return np.einsum('...i,...i->...', values, values)[..., np.newaxis] / max(values.shape[-1], 1)
+
+
+# множитель шума для ОСШ snr_db при мощностях сигнала и шума (числа или столбцы по каналам);
+# при нулевой мощности шума множитель равен 0
+def snr_scale(signal_power, noise_power, snr_db):
+    noise_power = np.where(noise_power == 0, np.inf, noise_power)
+    return np.sqrt(signal_power / (noise_power * 10 ** (np.asarray(snr_db)[..., np.newaxis] / 10)))
+
+
+# gain * сигнал + шумы noises; out - буфер результата (может совпадать с sig.samples,
+# тогда исходные отсчёты заменяются), work - буфер шума той же длины,
+# cutoff - ФНЧ (Гц) для результата
+def add_noise(sig, noises, gain=1.0, out=None, work=None, rng=None, cutoff=None, order=5):
+    samples = sig.samples
+    if out is None:
+        out = np.empty(samples.shape, dtype=samples.dtype)
+    if work is None:
+        work = np.empty(out.shape, dtype=out.dtype)
+    rng = _rng(rng)
+    fs = 1 / sig.delta_t
+    signal_power = gain ** 2 * power(samples)
+    np.multiply(samples, gain, out=out)
+    for noise in noises:
+        kind, snr_db = noise[0], noise[1]
+        params = noise[2] if len(noise) > 2 else {}
+        fill_noise(kind, work, fs, rng, **params)
+        np.multiply(work, snr_scale(signal_power, power(work), snr_db), out=work)
+        np.add(out, work, out=out)
+    if cutoff is not None:
+        out[...] = filters.lowpass(out, cutoff, fs, order)
+    return Signal(out, sig.delta_t, sig.t0)
+
+
+# count зашумлённых реализаций одного сигнала строками одной матрицы (count, len(sig))
+def noisy_vectors(sig, noises, count, gain=1.0, rng=None, dtype=None, cutoff=None, order=5):
+    out = np.empty((count, len(sig)), dtype=sig.samples.dtype if dtype is None else dtype)
+    work = np.empty(len(sig), dtype=out.dtype)
+    rng = _rng(rng)
+    for row in out:
+        add_noise(sig, noises, gain, row, work, rng, cutoff, order)
+    return out
@@ -1,5 +1,14 @@
 import numpy as np
-from scipy.signal import butter, lfilter
+
+from signal_noise_generator.noise_generator import filters
+
+# scipy.signal импортируется в функциях фильтрации: для остальных шумов он не нужен
+
+# size - число отсчётов или форма (каналы, отсчёты): шум формируется и фильтруется по последней оси
+
+# коэффициенты IIR-фильтра 1/f для розового шума (потоковый и смешиваемый шум)
+PINK_B = [0.049922035, -0.095993537, 0.050612699, -0.004408786]
+PINK_A = [1, -2.494956002, 2.017265875, -0.522189400]
 
 
 def white_noise(size, mean=0, std_dev=1):
@@ -8,7 +17,7 @@ def white_noise(size, mean=0, std_dev=1):
 
 def pink_noise(size):
     white = np.random.normal(0, 1, size)
-    freq = np.fft.fftfreq(size)
+    freq = np.fft.fftfreq(np.shape(white)[-1])
     freq[0] = 1e-6
     spectrum = np.fft.fft(white)
     spectrum /= np.sqrt(np.abs(freq))
@@ -17,16 +26,19 @@ def pink_noise(size):
     return pink.real
 
 
+# коэффициенты (b, a) ФНЧ Баттерворта; сами шумы фильтруются через filters (форма SOS)
 def butter_lowpass(cutoff, fs, order=5):
+    from scipy.signal import butter
+
     nyquist = 0.5 * fs
     normal_cutoff = cutoff / nyquist
     b, a = butter(order, normal_cutoff, btype='low', analog=False)
     return b, a
 
 
+# ФНЧ Баттерворта; расчёт фильтра кэшируется (filters.design)
 def lowpass_filter(data, cutoff, fs, order=5):
-    b, a = butter_lowpass(cutoff, fs, order)
-    return lfilter(b, a, data)
+    return filters.lowpass(data, cutoff, fs, order)
 
 
 def white_noise_filtered(size, cutoff, fs):
@@ -34,10 +46,64 @@ def white_noise_filtered(size, cutoff, fs):
     return lowpass_filter(white, cutoff, fs)
 
 
+# для нескольких каналов события распределяются по всем отсчётам сразу
 def impulse_noise(size, density=0.1, magnitude=5):
     noise = np.zeros(size)
-    num_impulses = int(size * density)
-    for _ in range(num_impulses):
-        index = np.random.randint(0, size)
-        noise[index] = np.random.choice([magnitude, -magnitude])
+    indices, values = sparse_events(noise.size, density, magnitude)
+    noise.reshape(-1)[indices] = values
     return noise
+
+
+# целые числа из [low, high) для np.random.Generator и для общего состояния np.random
+def _randint(random, low, high, size):
+    if isinstance(random, np.random.Generator):
+        return random.integers(low, high, size)
+    return random.randint(low, high, size)
+
+
+def _event_amplitudes(distribution, magnitude, count, random=np.random):
+    if distribution == 'sign':
+        return random.choice([magnitude, -magnitude], count)
+    if distribution == 'uniform':
+        return random.uniform(-magnitude, magnitude, count)
+    if distribution == 'normal':
+        return random.normal(0, magnitude, count)
+    if distribution == 'laplace':
+        return random.laplace(0, magnitude, count)
+    raise ValueError(f'Неизвестное распределение амплитуд: {distribution}')
+
+
+# Разреженные импульсные события в виде (индексы, значения) без плотного массива.
+# process: 'bernoulli' - ровно size * density событий, 'poisson' - пуассоновский поток
+# с интенсивностью density событий на отсчёт. amplitude: 'sign' (±magnitude), 'uniform',
+# 'normal', 'laplace'. burst - длина пачки в отсчётах: число или диапазон (min, max).
+# rng - np.random.Generator; по умолчанию события берутся из общего состояния np.random.
+def sparse_events(size, density=0.1, magnitude=5, process='bernoulli', amplitude='sign', burst=1, rng=None):
+    random = np.random if rng is None else rng
+    if process == 'bernoulli':
+        count = int(size * density)
+    elif process == 'poisson':
+        count = random.poisson(size * density)
+    else:
+        raise ValueError(f'Неизвестный поток событий: {process}')
+    indices = np.sort(_randint(random, 0, size, count))
+    values = _event_amplitudes(amplitude, magnitude, count, random)
+    if np.ndim(burst) == 0 and burst == 1:
+        return indices, values
+
+    # каждое событие растягивается на lengths отсчётов подряд
+    if np.ndim(burst) == 0:
+        lengths = np.full(count, int(burst))
+    else:
+        lengths = _randint(random, burst[0], burst[1] + 1, count)
+    offsets = np.arange(lengths.sum()) - np.repeat(np.cumsum(lengths) - lengths, lengths)
+    indices = np.repeat(indices, lengths) + offsets
+    values = np.repeat(values, lengths)
+    inside = indices < size
+    return indices[inside], values[inside]
+
+
+# добавление разреженных событий к сигналу на месте (повторы индексов суммируются)
+def add_events(signal, indices, values):
+    np.add.at(signal, indices, values)
+    return signal
@@ -0,0 +1,11 @@
+# Точки проверки хода долгих расчётов (синтез по блокам, сегменты спектров). Пакет не зависит
+# от приложения: обработчик подставляет фоновый исполнитель (worker.py), иначе вызовы ничего
+# не делают. Обработчик может прервать расчёт исключением (отмена задания).
+
+handler = None
+
+
+# доля выполненного расчёта (0..1) или None, если общий объём неизвестен
+def report(fraction=None):
+    if handler is not None:
+        handler(fraction)
@@ -0,0 +1,50 @@
+import math
+
+import numpy as np
+
+
+# число отсчётов в np.arange(start, stop, step) без создания массива
+def samples_count(stop, step, start=0.0):
+    return max(0, math.ceil((stop - start) / step))
+
+
+# Дискретный сигнал: отсчёты и равномерная ось времени t = t0 + i * delta_t.
+# Ось времени не хранится и вычисляется только при обращении к t (например, для графика).
+# Для совместимости с прежними генераторами распаковывается как пара: t, s = signal.
+class Signal:
+    __slots__ = ('samples', 't0', 'delta_t')
+
+    def __init__(self, samples, delta_t, t0=0.0, dtype=None):
+        self.samples = np.asarray(samples, dtype=dtype)
+        self.delta_t = delta_t
+        self.t0 = t0
+
+    def __len__(self):
+        return self.samples.shape[-1]
+
+    def __iter__(self):
+        yield self.t
+        yield self.samples
+
+    def __repr__(self):
+        return (f'Signal(samples={self.samples.shape}, dtype={self.samples.dtype}, t0={self.t0}, '
+                f'delta_t={self.delta_t})')
+
+    @property
+    def t(self):
+        return self.time(np.arange(len(self)))
+
+    # моменты времени для отсчётов с номерами index
+    def time(self, index):
+        return self.t0 + np.asarray(index) * self.delta_t
+
+    @property
+    def nbytes(self):
+        return self.samples.nbytes
+
+    @property
+    def dtype(self):
+        return self.samples.dtype
+
+    def astype(self, dtype):
+        return Signal(self.samples.astype(dtype), self.delta_t, self.t0)
@@ -0,0 +1,161 @@
+import inspect
+import io
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import numpy as np
+
+from signal_noise_generator import storage
+from signal_noise_generator.noise_generator import noises
+from signal_noise_generator.sampled import Signal
+from signal_noise_generator.signal_generator import signals
+from signal_noise_generator.spectrum import spectra
+
+# Вызов генераторов, шумов и спектров без интерфейса (python -m signal_noise_generator и
+# HTTP-сервер). Запрос - словарь JSON:
+#   {"function": "harmonic_signal", "args": {"A": 1, "T": 0.5, "T_N": 10, "delta_t": 0.001}}
+# необязательные поля: "seed" (для шумов), "dtype" (тип отсчётов в ответе, по умолчанию float32),
+# "signal" - вложенный запрос или путь к файлу .sig, сигнал которого передаётся в функцию спектра.
+# Ответ - записи формата signal_noise_generator.storage подряд, по одной на массив результата;
+# поле "request" в заголовке записи - номер запроса в пакете.
+
+GENERATORS = ('harmonic_signal', 'polyharmonic_signal', 'polyharmonic_synthesis', 'unipolar_pulses',
+              'bipolar_pulses', 'damped_sine_wave', 'single_pulse', 'single_rectangular_pulse',
+              'single_exponential_pulse', 'unit_step', 'delta_function', 'triangular_signal')
+NOISES = ('white_noise', 'pink_noise', 'white_noise_filtered', 'impulse_noise', 'sparse_events')
+SPECTRA = ('spectrum', 'welch', 'spectrogram')  # первые аргументы - отсчёты сигнала и шаг дискретизации
+
+FUNCTIONS = dict([(name, getattr(signals, name)) for name in GENERATORS]
+                 + [(name, getattr(noises, name)) for name in NOISES]
+                 + [(name, getattr(spectra, name)) for name in SPECTRA])
+
+# части результата, которые возвращают кортежем
+PARTS = {'welch': ('freq', 'psd'), 'spectrogram': ('times', 'freq', 'power'), 'sparse_events': ('indices', 'values')}
+
+_random_lock = threading.Lock()  # шумы используют общий генератор np.random
+
+
+def describe():
+    return {name: str(inspect.signature(function)) for name, function in FUNCTIONS.items()}
+
+
+# прогрев процесса: импорт scipy.signal и первые вызовы БПФ выполняются до первого запроса
+def warm():
+    import scipy.signal  # noqa: F401
+    spectra.spectrum(np.zeros(64), 1.0)
+    spectra.welch(np.zeros(64), 1.0, 32)
+
+
+def _input_signal(source):
+    if isinstance(source, str):
+        return storage.load(source)
+    sig = execute(source)
+    if not isinstance(sig, Signal):
+        raise ValueError(f'{source.get("function")}: результат не является сигналом')
+    return sig
+
+
+def execute(request):
+    name = request.get('function')
+    if name not in FUNCTIONS:
+        raise ValueError(f'Неизвестная функция: {name}')
+    args = request.get('args', {})
+    positional = []
+    if name in SPECTRA:
+        if 'signal' not in request:
+            raise ValueError(f'{name}: не задан сигнал ("signal")')
+        sig = _input_signal(request['signal'])
+        positional = [sig.samples, sig.delta_t]
+    if 'seed' in request:
+        with _random_lock:
+            np.random.seed(request['seed'])
+            return FUNCTIONS[name](*positional, **args)
+    return FUNCTIONS[name](*positional, **args)
+
+
+# пакет запросов: объект запроса или список объектов, иначе ValueError
+def requests_list(requests):
+    if isinstance(requests, dict):
+        return [requests]
+    if isinstance(requests, list) and all(isinstance(request, dict) for request in requests):
+        return requests
+    raise ValueError('Ожидается запрос (объект JSON) или список запросов')
+
+
+# запись результата одного запроса
+def write_result(file, name, result, dtype=np.float32, **meta):
+    meta = dict(meta, function=name)
+    if isinstance(result, Signal):
+        storage.save(file, result, dtype, **meta)
+    elif isinstance(result, spectra.Spectrum):
+        storage.write_spectrum(file, result, np.result_type(dtype, np.complex64), **meta)
+    elif isinstance(result, tuple):
+        for part, values in zip(PARTS.get(name, range(len(result))), result):
+            values = np.asarray(values)
+            storage.write_array(file, values, dtype if values.dtype.kind == 'f' else None, part=part, **meta)
+    else:
+        storage.write_array(file, result, dtype, **meta)
+
+
+# пакет запросов: результаты записываются в file по мере готовности;
+# при ошибке запроса записывается пустой массив с полем "error", остальные запросы выполняются
+def run_batch(requests, file):
+    requests = requests_list(requests)
+    for index, request in enumerate(requests):
+        try:
+            result = execute(request)
+            buffer = io.BytesIO()
+            write_result(buffer, request['function'], result, request.get('dtype', 'float32'), request=index)
+        except Exception as e:
+            buffer = io.BytesIO()
+            storage.write_array(buffer, np.empty(0, dtype=np.uint8), request=index, error=str(e))
+        file.write(buffer.getvalue())
+
+
+class Handler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'  # соединение не закрывается между запросами
+
+    def _send(self, status, body, content_type):
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        if self.path != '/functions':
+            return self._send(404, b'', 'text/plain')
+        self._send(200, json.dumps(describe(), ensure_ascii=False).encode(), 'application/json')
+
+    # POST /batch: запрос или список запросов JSON, ответ передаётся частями по мере расчёта
+    def do_POST(self):
+        if self.path != '/batch':
+            return self._send(404, b'', 'text/plain')
+        # тело проверяется до отправки заголовков: после них ошибку уже не сообщить кодом ответа
+        try:
+            requests = requests_list(json.loads(self.rfile.read(int(self.headers.get('Content-Length', 0)))))
+        except ValueError as e:
+            return self._send(400, str(e).encode(), 'text/plain; charset=utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/octet-stream')
+        self.send_header('Transfer-Encoding', 'chunked')
+        self.end_headers()
+        run_batch(requests, self)
+        self.wfile.write(b'0\r\n\r\n')
+
+    # запись одного фрагмента ответа (для run_batch обработчик выступает файлом)
+    def write(self, data):
+        self.wfile.write(f'{len(data):x}\r\n'.encode() + data + b'\r\n')
+
+    def log_message(self, format, *args):
+        pass
+
+
+def serve(host='127.0.0.1', port=8750):
+    warm()
+    server = ThreadingHTTPServer((host, port), Handler)
+    try:
+        server.serve_forever()
+    finally:
+        server.server_close()
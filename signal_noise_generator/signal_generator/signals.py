@@ -1,98 +1,195 @@
+import math
+from fractions import Fraction
+
 import numpy as np
-import matplotlib.pyplot as plt
 
+from signal_noise_generator import progress
+from signal_noise_generator.sampled import Signal, samples_count
 
-def harmonic_signal(A, T, T_N, delta_t=None):
-    if delta_t is None:
-        delta_t = T / 1000
-    t = np.arange(0, T_N, delta_t)
-    s = A * np.sin((2 * np.pi / T) * t)
-    return t, s
+# Многоканальный режим: параметры генераторов могут быть векторами значений по каналам,
+# тогда результат имеет форму (каналы, отсчёты) с общей осью времени.
+
+
+# параметр по каналам: скаляр или массив -> массив формы (*каналы, 1) для умножения на ось времени
+def _channels(value):
+    return np.asarray(value, dtype=float)[..., np.newaxis]
+
+
+# периодический сигнал через фазу внутри периода. Параметры A, T, phi могут быть
+# массивами: тогда результат имеет форму (*форма параметров, len(t)), например
+# periodic_waveform('harmonic', t, A=np.linspace(0, 1, 1000)) -> (1000, len(t))
+def periodic_waveform(kind, t, A=1, T=1, phi=0, duty=0.5):
+    t = np.asarray(t)
+    A = _channels(A)
+    T = _channels(T)
+    phi = _channels(phi)
+    phase = np.mod(t / T + phi / (2 * np.pi), 1.0)
+    if kind == 'harmonic':
+        return A * np.sin(2 * np.pi * phase)
+    if kind == 'triangle':
+        return 4 * A * np.minimum(phase, 1 - phase)
+    if kind == 'sawtooth':
+        return A * (2 * phase - 1)
+    if kind == 'square':
+        return np.where(phase < duty, A, -A)
+    raise ValueError(f'Неизвестный вид сигнала: {kind}')
 
 
-def polyharmonic_signal(T, T_N, delta_t=None, A_list=[1]):
+def harmonic_signal(A, T, T_N, delta_t=None, dtype=np.float64, phi=0):
     if delta_t is None:
-        delta_t = T / 1000
+        delta_t = np.min(T) / 1000
     t = np.arange(0, T_N, delta_t)
-    s = np.zeros_like(t)
-    for i, A in enumerate(A_list, start=1):
-        s += A * np.sin((2 * np.pi * i / T) * t)
-    return t, s
+    s = periodic_waveform('harmonic', t, A, T, phi)
+    return Signal(s, delta_t, dtype=dtype)
+
+
+# длина в отсчётах, на которой все гармоники укладываются целым числом периодов
+# (None, если такой длины не больше max_len или есть частоты выше Найквиста)
+def _common_period(frequencies, delta_t, n, max_len):
+    cycles = np.asarray(frequencies, dtype=float) * delta_t  # периодов на отсчёт
+    if np.any(cycles < 0) or np.any(cycles >= 0.5):
+        return None
+    length = 1
+    for c in np.unique(cycles):
+        fraction = Fraction(float(c)).limit_denominator(max_len)
+        if abs(float(fraction) - c) * n > 1e-6:  # набег фазы за весь сигнал
+            return None
+        length = math.lcm(length, fraction.denominator)
+        if length > max_len:
+            return None
+    return length
+
+
+# s(t) = sum(A_k * sin(2 * pi * f_k * t + phi_k)) на сетке t = t0 + i * delta_t, i < n.
+# 'outer' - матричное умножение sin(t x omega) @ A по блокам времени (память ограничена chunk_bytes),
+# 'ifft' - один период сигнала обратным БПФ и его повторение (для многих гармоник),
+# 'auto' выбирает более дешёвый способ. Амплитуды и фазы формы (каналы, гармоники) дают
+# сигналы формы (каналы, n) с общим набором частот
+def polyharmonic_synthesis(frequencies, n, delta_t, t0=0.0, amplitudes=None, phases=None, method='auto',
+                           chunk_bytes=2 ** 24, max_period=2 ** 22):
+    frequencies = np.atleast_1d(np.asarray(frequencies, dtype=float))
+    amplitudes = np.ones_like(frequencies) if amplitudes is None else np.asarray(amplitudes, dtype=float)
+    phases = np.zeros_like(frequencies) if phases is None else np.asarray(phases, dtype=float)
+    shape = np.broadcast_shapes(frequencies.shape, amplitudes.shape, phases.shape)
+    amplitudes, phases = np.broadcast_to(amplitudes, shape), np.broadcast_to(phases, shape)
+    channels = shape[:-1]
+    count = len(frequencies)
+    if count == 0:  # нет гармоник - нулевой сигнал
+        return np.zeros(channels + (n,))
+
+    length = None
+    if method in ('auto', 'ifft'):
+        length = _common_period(frequencies, delta_t, n, max_period)
+        if method == 'ifft' and length is None:
+            raise ValueError('Гармоники не укладываются в период на сетке отсчётов')
+        if method == 'auto' and length is not None and length * math.log2(length + 1) + n > n * count:
+            length = None
+
+    if length is not None:
+        spectrum = np.zeros((int(np.prod(channels)), length // 2 + 1), dtype=complex)
+        bins = np.rint(frequencies * delta_t * length).astype(np.int64)
+        weights = amplitudes * (length / 2) * np.exp(1j * (phases + 2 * np.pi * frequencies * t0 - np.pi / 2))
+        weights[..., bins == 0] *= 2  # постоянная составляющая не имеет пары
+        np.add.at(spectrum, (slice(None), bins), weights.reshape(-1, count))
+        period = np.fft.irfft(spectrum.reshape(channels + (length // 2 + 1,)), n=length)
+        return np.tile(period, -(-n // length))[..., :n]
+
+    s = np.empty(channels + (n,))
+    omega = 2 * np.pi * frequencies
+    rows = max(1, chunk_bytes // (8 * count))
+    if channels:
+        # sin(x + phi) = sin(x) cos(phi) + cos(x) sin(phi): две матрицы на все каналы сразу
+        sin_weights = (amplitudes * np.cos(phases)).reshape(-1, count).T
+        cos_weights = (amplitudes * np.sin(phases)).reshape(-1, count).T
+        flat = s.reshape(-1, n)
+    for start in range(0, n, rows):
+        progress.report(start / n)  # точка отмены между блоками
+        stop = min(n, start + rows)
+        argument = np.multiply.outer(t0 + np.arange(start, stop) * delta_t, omega)
+        if channels:
+            flat[:, start:stop] = (np.sin(argument) @ sin_weights + np.cos(argument) @ cos_weights).T
+            continue
+        argument += phases
+        np.sin(argument, out=argument)
+        np.dot(argument, amplitudes, out=s[start:stop])
+    return s
+
+
+# A_list формы (каналы, гармоники) - по набору амплитуд на канал
+def polyharmonic_signal(T, T_N, delta_t=None, A_list=[1], dtype=np.float64):
+    if delta_t is None:
+        delta_t = T / 1000
+    numbers = np.arange(1, np.shape(A_list)[-1] + 1)  # номера гармоник: частоты i / T
+    s = polyharmonic_synthesis(numbers / T, samples_count(T_N, delta_t), delta_t, amplitudes=A_list)
+    return Signal(s, delta_t, dtype=dtype)
 
 
-def unipolar_pulses(T, n, T_N, delta_t):
-    t = np.arange(0, T_N, delta_t)
-    s = np.zeros_like(t)
-    for i in range(n):
-        start = int(i * T / delta_t)
-        end = int((i + 1) * T / delta_t)
-        s[start:end] = 1
-    return t, s
+# уровни n импульсов длительностью T для отсчётов с номерами index (T и n - по каналам)
+def pulse_levels(index, T, n, delta_t, bipolar=False):
+    number = np.floor(index * (delta_t / _channels(T)) + 1e-9)  # номер импульса по номеру отсчёта
+    if bipolar:
+        levels = np.where(number % 2 == 0, 1.0, -1.0)
+    else:
+        levels = 1.0
+    return np.where(number >= _channels(n), 0.0, levels)
 
 
-def bipolar_pulses(T, n, T_N, delta_t):
-    t = np.arange(0, T_N, delta_t)
-    s = np.zeros_like(t)
-    for i in range(n):
-        start = int(i * T / delta_t)
-        end = int((i + 1) * T / delta_t)
-        s[start:end] = 1 if i % 2 == 0 else -1
-    return t, s
+def unipolar_pulses(T, n, T_N, delta_t, dtype=np.float64):
+    s = pulse_levels(np.arange(samples_count(T_N, delta_t)), T, n, delta_t)
+    return Signal(s, delta_t, dtype=dtype)
+
 
+def bipolar_pulses(T, n, T_N, delta_t, dtype=np.float64):
+    s = pulse_levels(np.arange(samples_count(T_N, delta_t)), T, n, delta_t, bipolar=True)
+    return Signal(s, delta_t, dtype=dtype)
 
-def damped_sine_wave(A, alpha, f, T_N, delta_t):
+
+def damped_sine_wave(A, alpha, f, T_N, delta_t, dtype=np.float64):
     t = np.arange(0, T_N, delta_t)
-    s = A * np.exp(-alpha * t) * np.sin(2 * np.pi * f * t)
-    return t, s
+    s = _channels(A) * np.exp(-_channels(alpha) * t) * np.sin(2 * np.pi * _channels(f) * t)
+    return Signal(s, delta_t, dtype=dtype)
 
 
-def single_pulse(T, T_N, delta_t):
+def single_pulse(T, T_N, delta_t, dtype=np.float64):
     t = np.arange(0, T_N, delta_t)
-    s = np.zeros_like(t)
-    s[t < T] = 1
-    return t, s
+    s = np.where(t < _channels(T), 1.0, 0.0)
+    return Signal(s, delta_t, dtype=dtype)
 
 
-def single_rectangular_pulse(A, T, T_N, delta_t):
+def single_rectangular_pulse(A, T, T_N, delta_t, dtype=np.float64):
     t = np.arange(0, T_N, delta_t)
-    s = np.zeros_like(t)
-    s[np.abs(t - T_N / 2) <= T / 2] = A
-    return t, s
+    s = np.where(np.abs(t - T_N / 2) <= _channels(T) / 2, _channels(A), 0.0)
+    return Signal(s, delta_t, dtype=dtype)
 
 
-def single_exponential_pulse(A, beta, T_N, delta_t):
+def single_exponential_pulse(A, beta, T_N, delta_t, dtype=np.float64):
     t = np.arange(0, T_N, delta_t)
-    s = A * np.exp(-beta * t)
-    return t, s
+    s = _channels(A) * np.exp(-_channels(beta) * t)
+    return Signal(s, delta_t, dtype=dtype)
 
 
-def unit_step(T, T_N, delta_t):
+def unit_step(T, T_N, delta_t, dtype=np.float64):
     t = np.arange(0, T_N, delta_t)
-    s = np.zeros_like(t)
-    s[t >= T] = 1
-    return t, s
+    s = np.where(t >= _channels(T), 1.0, 0.0)
+    return Signal(s, delta_t, dtype=dtype)
 
 
-def delta_function(A, T, T_N, delta_t):
+def delta_function(A, T, T_N, delta_t, dtype=np.float64):
     t = np.arange(0, T_N, delta_t)
-    s = np.zeros_like(t)
-    s[np.abs(t - T) < delta_t / 2] = A
-    return t, s
+    s = np.where(np.abs(t - _channels(T)) < delta_t / 2, _channels(A), 0.0)
+    return Signal(s, delta_t, dtype=dtype)
 
 
-def triangular_signal(A, T, T_N, delta_t):
+def triangular_signal(A, T, T_N, delta_t, dtype=np.float64):
     t = np.arange(0, T_N, delta_t)
-    s = np.zeros_like(t)
-    for i, time in enumerate(t):
-        phase = (time % T) / T
-        if phase < 0.5:
-            s[i] = 4 * A * phase
-        else:
-            s[i] = 4 * A * (1 - phase)
-    return t, s
+    s = periodic_waveform('triangle', t, A, T)
+    return Signal(s, delta_t, dtype=dtype)
 
 
+# matplotlib импортируется только здесь: генераторам он не нужен
 def plot_signals():
+    import matplotlib.pyplot as plt
+
     plt.figure(figsize=(15, 20))
 
     # Гармонический сигнал
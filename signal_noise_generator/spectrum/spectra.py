@@ -0,0 +1,205 @@
+import functools
+
+import numpy as np
+
+from signal_noise_generator import progress
+
+WINDOWS = {'hann': np.hanning, 'hamming': np.hamming, 'blackman': np.blackman}
+
+
+# ближайшая сверху длина вида 2^a * 3^b * 5^c (для таких длин БПФ быстрее всего)
+@functools.lru_cache(maxsize=None)
+def next_fast_len(n):
+    best = 1 << max(0, n - 1).bit_length()
+    p5 = 1
+    while p5 < best:
+        p35 = p5
+        while p35 < best:
+            length = p35
+            while length < n:
+                length *= 2
+            best = min(best, length)
+            p35 *= 3
+        p5 *= 5
+    return best
+
+
+# ось частот (Гц) для вещественного БПФ длины n; кэшируется по (n, delta_t)
+@functools.lru_cache(maxsize=64)
+def frequencies(n, delta_t):
+    freq = np.fft.rfftfreq(n, delta_t)
+    freq.setflags(write=False)
+    return freq
+
+
+# оконная функция длины n (None - прямоугольное окно); кэшируется по (name, n).
+# Окна периодические (как в scipy.signal.get_window): симметричное окно длины n + 1 без
+# последнего отсчёта, что и нужно для спектральных оценок
+@functools.lru_cache(maxsize=64)
+def window(name, n):
+    if name is None:
+        w = np.ones(n)
+    elif name in WINDOWS:
+        w = WINDOWS[name](n + 1)[:-1]
+    else:
+        raise ValueError(f'Неизвестное окно: {name}')
+    w.setflags(write=False)
+    return w
+
+
+# односторонний спектр вещественного сигнала (для многоканального сигнала - по последней оси);
+# все представления считаются из одного преобразования при обращении и не запоминаются:
+# спектр хранится в общем кэше, размер которого учитывает только values и freq
+# (представления для графика кэшируются отдельно, см. cache.projection)
+class Spectrum:
+    def __init__(self, values, freq, n):
+        values.setflags(write=False)
+        self.values = values  # результат rfft
+        self.freq = freq  # частоты, Гц
+        self.n = n  # длина БПФ
+
+    @property
+    def nbytes(self):
+        return self.values.nbytes + self.freq.nbytes
+
+    @property
+    def real(self):
+        return self.values.real
+
+    @property
+    def imag(self):
+        return self.values.imag
+
+    @property
+    def amplitude(self):
+        return np.abs(self.values)
+
+    @property
+    def phase(self):
+        return np.angle(self.values)
+
+    # комплексные амплитуды гармоник: values / n, кроме постоянной составляющей
+    # и частоты Найквиста удваиваются (вклад отрицательных частот)
+    @property
+    def scaled(self):
+        scaled = self.values / self.n
+        scaled[..., 1:(self.n + 1) // 2] *= 2
+        return scaled
+
+
+# Спектр сигнала длины n. policy определяет, что делать с сигналом, длиннее n:
+# 'truncate' - обрезать до n (короткий сигнал дополняется нулями),
+# 'pad' - дополнить нулями до max(n, длина сигнала), 'fast' - то же до быстрой длины БПФ.
+# Сигнал формы (каналы, отсчёты) преобразуется одним вызовом rfft по последней оси.
+def spectrum(signal, delta_t, n=None, policy='truncate', window_name=None):
+    signal = np.asarray(signal)
+    samples = signal.shape[-1]
+    length = samples if n is None else n
+    if policy == 'truncate':
+        size = length
+    elif policy == 'pad':
+        size = max(length, samples)
+    elif policy == 'fast':
+        size = next_fast_len(max(length, samples))
+    else:
+        raise ValueError(f'Неизвестный способ выбора длины БПФ: {policy}')
+    data = signal[..., :size]
+    if window_name is not None:
+        data = data * window(window_name, data.shape[-1])
+    return Spectrum(np.fft.rfft(data, n=size, axis=-1), frequencies(size, delta_t), size)
+
+
+# Сегменты длины nperseg с перекрытием noverlap из массива или потока блоков
+# (массивов или пар (t, s) из signal_noise_generator.streaming). Сегменты выдаются
+# пачками не больше batch штук; в памяти держится только текущий блок и хвост
+# предыдущего короче одного сегмента. Для блоков формы (каналы, отсчёты) пачка
+# имеет форму (каналы, сегменты, nperseg).
+def iter_segments(blocks, nperseg, noverlap, batch=256):
+    if isinstance(blocks, np.ndarray):
+        blocks = (blocks,)
+    hop = nperseg - noverlap
+    buffer = np.empty(0)
+    for block in blocks:
+        if isinstance(block, tuple):
+            block = block[1]
+        buffer = np.asarray(block) if buffer.shape[-1] == 0 else np.concatenate((buffer, block), axis=-1)
+        if buffer.shape[-1] < nperseg:
+            continue
+        count = (buffer.shape[-1] - nperseg) // hop + 1
+        frames = np.lib.stride_tricks.sliding_window_view(buffer, nperseg, axis=-1)[..., ::hop, :]
+        for start in range(0, count, batch):
+            yield frames[..., start:min(count, start + batch), :]
+        buffer = buffer[..., count * hop:]
+
+
+# спектральная плотность мощности сегментов (односторонняя)
+def _segment_psd(frames, w, delta_t):
+    values = np.fft.rfft(frames * w, axis=-1)
+    power = values.real ** 2 + values.imag ** 2
+    power *= delta_t / np.sum(w ** 2)
+    power[..., 1:(len(w) + 1) // 2] *= 2
+    return power
+
+
+# число сегментов массива (для хода выполнения); для потока блоков заранее неизвестно
+def _segments_total(blocks, nperseg, noverlap):
+    if isinstance(blocks, np.ndarray) and blocks.shape[-1] >= nperseg:
+        return (blocks.shape[-1] - nperseg) // (nperseg - noverlap) + 1
+    return None
+
+
+def _overlap(nperseg, noverlap):
+    noverlap = nperseg // 2 if noverlap is None else noverlap
+    if not 0 <= noverlap < nperseg:
+        raise ValueError('Перекрытие должно быть меньше длины сегмента')
+    return noverlap
+
+
+# Усреднённая периодограмма (метод Уэлча): память ограничена длиной сегмента, а не сигнала.
+# Возвращает частоты (Гц) и спектральную плотность мощности (по строке на канал).
+def welch(blocks, delta_t, nperseg=256, noverlap=None, window_name='hann'):
+    noverlap = _overlap(nperseg, noverlap)
+    w = window(window_name, nperseg)
+    total = np.zeros(nperseg // 2 + 1)  # при первой пачке расширяется до (каналы, частоты)
+    count = 0
+    segments = _segments_total(blocks, nperseg, noverlap)
+    for frames in iter_segments(blocks, nperseg, noverlap):
+        progress.report(count / segments if segments else None)
+        psd = _segment_psd(frames, w, delta_t).sum(axis=-2)
+        if total.shape != psd.shape:
+            total = total + psd
+        else:
+            total += psd
+        count += frames.shape[-2]
+    return frequencies(nperseg, delta_t), total / max(count, 1)
+
+
+# Спектрограмма (STFT): мощность каждого сегмента, средние по average соседним сегментам.
+# Возвращает моменты времени (центры групп сегментов), частоты и матрицу (частоты, время),
+# для нескольких каналов - (каналы, частоты, время).
+def spectrogram(blocks, delta_t, nperseg=256, noverlap=None, window_name='hann', average=1):
+    noverlap = _overlap(nperseg, noverlap)
+    hop = nperseg - noverlap
+    w = window(window_name, nperseg)
+    columns, carry = [], None  # carry - сегменты неполной группы
+    count = 0
+    segments = _segments_total(blocks, nperseg, noverlap)
+    for frames in iter_segments(blocks, nperseg, noverlap):
+        progress.report(count / segments if segments else None)
+        power = _segment_psd(frames, w, delta_t)
+        if carry is not None:
+            power = np.concatenate((carry, power), axis=-2)
+        full = power.shape[-2] // average * average
+        groups = power[..., :full, :]
+        columns.append(groups.reshape(groups.shape[:-2] + (-1, average, power.shape[-1])).mean(axis=-2))
+        carry = power[..., full:, :]
+        count += frames.shape[-2]
+    if carry is not None and carry.shape[-2]:
+        columns.append(carry.mean(axis=-2, keepdims=True))
+    if not columns:
+        columns.append(np.empty((0, nperseg // 2 + 1)))
+    power = np.swapaxes(np.concatenate(columns, axis=-2), -1, -2)
+    starts = np.arange(power.shape[-1]) * average * hop
+    ends = np.minimum(starts + (average - 1) * hop, (count - 1) * hop)
+    times = ((starts + ends) / 2 + nperseg / 2) * delta_t
+    return times, frequencies(nperseg, delta_t), power
@@ -0,0 +1,150 @@
+import json
+
+import numpy as np
+
+from signal_noise_generator.sampled import Signal
+
+# Двоичный формат отсчётов: сигнатура MAGIC, длина заголовка (uint32, little-endian),
+# заголовок JSON, дополненный пробелами до кратного ALIGN размера, затем сами отсчёты.
+# Ось времени не хранится: вместо неё в заголовке t0 и delta_t (для спектра - n и delta_t
+# исходного сигнала, частоты k / (n * delta_t)). Чтение через np.memmap не загружает данные.
+
+MAGIC = b'SNGSIG01'
+ALIGN = 64
+STREAM_HEADER = 512  # место под заголовок при потоковой записи, когда длина ещё неизвестна
+
+
+def _header_bytes(header, size=None):
+    text = json.dumps(header, ensure_ascii=False).encode()
+    prefix = len(MAGIC) + 4
+    if size is None:
+        size = -(-(prefix + len(text)) // ALIGN) * ALIGN
+    if prefix + len(text) > size:
+        raise ValueError('Заголовок не помещается в отведённое место')
+    text = text.ljust(size - prefix)
+    return MAGIC + np.uint32(len(text)).astype('<u4').tobytes() + text
+
+
+def _open(file, mode):
+    if hasattr(file, 'write') or hasattr(file, 'read'):
+        return file, False
+    return open(file, mode), True
+
+
+def _write(file, header, values):
+    f, close = _open(file, 'wb')
+    try:
+        f.write(_header_bytes(dict(header, dtype=values.dtype.str, shape=values.shape)))
+        f.write(values.tobytes())
+    finally:
+        if close:
+            f.close()
+
+
+def write_signal(file, samples, delta_t, t0=0.0, dtype=np.float32, **meta):
+    samples = np.ascontiguousarray(samples, dtype=np.dtype(dtype).newbyteorder('<'))
+    _write(file, dict(meta, kind='signal', t0=t0, delta_t=delta_t), samples)
+
+
+def save(file, sig, dtype=np.float32, **meta):
+    write_signal(file, sig.samples, sig.delta_t, sig.t0, dtype, **meta)
+
+
+# запись потока блоков (массивов или пар (t, s) из signal_noise_generator.streaming)
+# без накопления сигнала в памяти; длина записывается в заголовок в конце
+def write_stream(path, blocks, delta_t, t0=0.0, dtype=np.float32, **meta):
+    dtype = np.dtype(dtype).newbyteorder('<')
+    length = 0
+    with open(path, 'wb') as f:
+        f.write(bytes(STREAM_HEADER))
+        for block in blocks:
+            if isinstance(block, tuple):
+                block = block[1]
+            block = np.asarray(block, dtype=dtype)
+            f.write(block.tobytes())
+            length += len(block)
+        header = dict(meta, kind='signal', dtype=dtype.str, shape=[length], t0=t0, delta_t=delta_t)
+        f.seek(0)
+        f.write(_header_bytes(header, STREAM_HEADER))
+    return length
+
+
+def write_spectrum(file, spec, dtype=np.complex64, **meta):
+    values = np.ascontiguousarray(spec.values, dtype=np.dtype(dtype).newbyteorder('<'))
+    delta_t = float(1 / (spec.n * spec.freq[1])) if len(spec.freq) > 1 else None
+    _write(file, dict(meta, kind='spectrum', n=spec.n, delta_t=delta_t), values)
+
+
+# произвольный массив (частоты, СПМ, шум без шага дискретизации); dtype=None - тип массива
+def write_array(file, values, dtype=None, **meta):
+    values = np.asarray(values)
+    values = np.ascontiguousarray(values, dtype=(values.dtype if dtype is None else np.dtype(dtype)).newbyteorder('<'))
+    _write(file, dict(meta, kind='array'), values)
+
+
+def _read_exact(f, size):
+    data = f.read(size)
+    if len(data) != size:
+        raise ValueError('Запись оборвана')
+    return data
+
+
+# заголовок записи из потока (None в конце потока)
+def _read_header(f):
+    magic = f.read(len(MAGIC))
+    if not magic:
+        return None
+    if magic != MAGIC:
+        raise ValueError('Неизвестный формат записи')
+    size = int(np.frombuffer(_read_exact(f, 4), dtype='<u4')[0])
+    header = json.loads(_read_exact(f, size))
+    header['offset'] = len(MAGIC) + 4 + size
+    return header
+
+
+def read_header(path):
+    with open(path, 'rb') as f:
+        try:
+            header = _read_header(f)
+        except ValueError:
+            header = None
+    if header is None:
+        raise ValueError(f'{path}: неизвестный формат файла')
+    return header
+
+
+# записи, идущие подряд в одном потоке (ответ signal_noise_generator.service):
+# пары (заголовок, массив), массивы читаются в память по одному
+def read_records(file):
+    while True:
+        header = _read_header(file)
+        if header is None:
+            return
+        dtype = np.dtype(header['dtype'])
+        count = int(np.prod(header['shape']))
+        yield header, np.frombuffer(_read_exact(file, count * dtype.itemsize), dtype).reshape(header['shape'])
+
+
+# заголовок и отсчёты, отображённые в память (файл не читается целиком)
+def read(path, mode='r'):
+    header = read_header(path)
+    data = np.memmap(path, dtype=np.dtype(header['dtype']), mode=mode, offset=header['offset'],
+                     shape=tuple(header['shape']))
+    return header, data
+
+
+# ось времени или частот по заголовку, только для отсчётов start:stop
+def axis(header, start=0, stop=None):
+    stop = header['shape'][-1] if stop is None else stop
+    index = np.arange(start, stop)
+    if header['kind'] == 'spectrum':
+        return index / (header['n'] * header['delta_t'])
+    return header['t0'] + index * header['delta_t']
+
+
+# сигнал из файла; отсчёты остаются отображёнными в память
+def load(path, mode='r'):
+    header, data = read(path, mode)
+    if header['kind'] != 'signal':
+        raise ValueError(f'{path}: файл не содержит сигнал')
+    return Signal(data, header['delta_t'], header['t0'])
@@ -0,0 +1,83 @@
+import numpy as np
+
+from signal_noise_generator.noise_generator import filters
+from signal_noise_generator.noise_generator.noises import PINK_A, PINK_B
+from signal_noise_generator.sampled import samples_count
+from signal_noise_generator.signal_generator.signals import periodic_waveform, polyharmonic_synthesis, pulse_levels
+
+# Потоковые варианты генераторов: вместо одного массива выдают блоки (t, s) по block_size
+# отсчётов. Время блока вычисляется по глобальному номеру отсчёта, поэтому фаза непрерывна
+# на границах блоков, а склеенные блоки совпадают с t = np.arange(0, T_N, delta_t).
+
+BLOCK_SIZE = 65536
+
+
+# номера отсчётов и время каждого блока из total отсчётов
+def _blocks(total, delta_t, block_size):
+    for start in range(0, total, block_size):
+        index = np.arange(start, min(total, start + block_size))
+        yield index, index * delta_t
+
+
+def iter_time(T_N, delta_t, block_size=BLOCK_SIZE):
+    # столько же отсчётов, сколько в np.arange(0, T_N, delta_t) и в генераторах массивов
+    return _blocks(samples_count(T_N, delta_t), delta_t, block_size)
+
+
+def iter_harmonic(A, T, T_N, delta_t, block_size=BLOCK_SIZE):
+    for _, t in iter_time(T_N, delta_t, block_size):
+        yield t, periodic_waveform('harmonic', t, A, T)
+
+
+def iter_polyharmonic(T, T_N, delta_t, A_list=[1], block_size=BLOCK_SIZE):
+    frequencies = np.arange(1, len(A_list) + 1) / T
+    for index, t in iter_time(T_N, delta_t, block_size):
+        yield t, polyharmonic_synthesis(frequencies, len(t), delta_t, t0=index[0] * delta_t, amplitudes=A_list)
+
+
+def iter_damped_sine(A, alpha, f, T_N, delta_t, block_size=BLOCK_SIZE):
+    for _, t in iter_time(T_N, delta_t, block_size):
+        yield t, A * np.exp(-alpha * t) * np.sin(2 * np.pi * f * t)
+
+
+def iter_pulses(T, n, T_N, delta_t, bipolar=False, block_size=BLOCK_SIZE):
+    for index, t in iter_time(T_N, delta_t, block_size):
+        yield t, pulse_levels(index, T, n, delta_t, bipolar)
+
+
+# шумы: size отсчётов, время t = номер отсчёта * delta_t
+def iter_white_noise(size, mean=0, std_dev=1, delta_t=1.0, block_size=BLOCK_SIZE):
+    for index, t in _blocks(size, delta_t, block_size):
+        yield t, np.random.normal(mean, std_dev, len(index))
+
+
+# розовый шум IIR-фильтром; состояние фильтра переносится между блоками
+def iter_pink_noise(size, delta_t=1.0, block_size=BLOCK_SIZE):
+    from scipy.signal import lfilter
+
+    zi = np.zeros(len(PINK_A) - 1)
+    for index, t in _blocks(size, delta_t, block_size):
+        s, zi = lfilter(PINK_B, PINK_A, np.random.normal(0, 1, len(index)), zi=zi)
+        yield t, s
+
+
+# белый шум через фильтр нижних частот; совпадает с lowpass_filter для всего массива
+def iter_white_noise_filtered(size, cutoff, fs, order=5, block_size=BLOCK_SIZE):
+    from scipy.signal import sosfilt
+
+    sos = filters.design('lowpass', cutoff, fs, order)
+    zi = filters.initial_state(sos)
+    for index, t in _blocks(size, 1 / fs, block_size):
+        s, zi = sosfilt(sos, np.random.normal(0, 1, len(index)), zi=zi)
+        yield t, s
+
+
+# импульсный шум: число событий в блоке - разность int(номер отсчёта * density) на его границах,
+# поэтому дробная часть переносится между блоками и всего событий столько же, сколько
+# в impulse_noise(size, density) (округление в каждом блоке теряло события при малой плотности)
+def iter_impulse_noise(size, density=0.1, magnitude=5, delta_t=1.0, block_size=BLOCK_SIZE):
+    for index, t in _blocks(size, delta_t, block_size):
+        count = int((index[-1] + 1) * density) - int(index[0] * density)
+        s = np.zeros(len(index))
+        s[np.random.randint(0, len(index), count)] = np.random.choice([magnitude, -magnitude], count)
+        yield t, s
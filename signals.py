@@ -1,70 +1,77 @@
 import numpy as np
 
+from signal_noise_generator.noise_generator import mixing
+from signal_noise_generator.sampled import Signal, samples_count
+# специальные сигналы общие с signal_noise_generator
+from signal_noise_generator.signal_generator.signals import (_channels, delta_function, polyharmonic_synthesis,
+                                                             single_pulse, unit_step)
 
-# специальные сигналы
-def single_pulse(T, T_N, delta_t):
-    t = np.arange(0, T_N, delta_t)
-    s = np.zeros_like(t)
-    s[t < T] = 1
-    return t, s
-
-
-def delta_function(A, T, T_N, delta_t):
-    t = np.arange(0, T_N, delta_t)
-    s = np.zeros_like(t)
-    s[np.abs(t - T) < delta_t / 2] = A
-    return t, s
-
-
-def unit_step(T, T_N, delta_t):
-    t = np.arange(0, T_N, delta_t)
-    s = np.zeros_like(t)
-    s[t >= T] = 1
-    return t, s
+# Параметры генераторов (частота, сдвиг, длительность и число импульсов, затухание) могут быть
+# списками значений по каналам: тогда сигнал имеет форму (каналы, отсчёты) с общей осью времени.
 
 
 # импульсы
-def generate_unipolar_pulses(signal_duration, pulse_duration, step):
-    t = np.arange(0.0, signal_duration, step)
-    signal = np.zeros_like(t)
-    for pulse_num in range(int(signal_duration / pulse_duration) + 1):
-        start = int(pulse_num * pulse_duration / step)
-        end = int(start + pulse_duration / 2 / step) + 1
-        signal[start:end] = 1
-    return t, signal
-
-
-def generate_bipolar_pulses(signal_duration, pulse_duration, step):
-    t = np.arange(0.0, signal_duration, step)
-    signal = np.empty_like(t)
-    for pulse_num in range(int(signal_duration / pulse_duration) + 1):
-        start = int(pulse_num * pulse_duration / step)
-        end_pulse = int(start + pulse_duration / 2 / step)
-        end = int(start + pulse_duration / step) + 1
-        signal[start:end_pulse] = 1
-        signal[end_pulse:end] = -1
-    return t, signal
-
-
-# функция генерации синусоидального сигнала
-def generate_harmonic(frequency, duration, step, shift):
+# импульсная последовательность: номер периода и фаза внутри него вычисляются
+# по номеру отсчёта, поэтому ошибка округления не накапливается от импульса к импульсу;
+# pulses - число импульсов, после которых сигнал равен нулю (None - без ограничения)
+def pulse_train(signal_duration, pulse_duration, step, duty=0.5, amplitude=1.0, polarity=(1,), baseline=0.0,
+                dtype=np.float64, pulses=None):
+    position = np.arange(samples_count(signal_duration, step)) * (step / _channels(pulse_duration))
+    number = np.floor(position + 1e-9)  # допуск на погрешность на границе периода
+    phase = position - number
+    polarity = np.asarray(polarity, dtype=dtype)
+    if len(polarity) == 1:
+        high = amplitude * polarity[0]
+    else:  # знак импульса чередуется по шаблону polarity
+        high = amplitude * polarity[number.astype(np.int64) % len(polarity)]
+    signal = np.where(phase < duty, high, baseline * amplitude)
+    if pulses is not None:  # после последнего импульса - ноль, а не baseline (без постоянной составляющей)
+        signal = np.where(number < _channels(pulses), signal, 0.0)
+    return Signal(signal, step, dtype=dtype)
+
+
+def generate_unipolar_pulses(signal_duration, pulse_duration, step, pulses=None, dtype=np.float64):
+    return pulse_train(signal_duration, pulse_duration, step, dtype=dtype, pulses=pulses)
+
+
+def generate_bipolar_pulses(signal_duration, pulse_duration, step, pulses=None, dtype=np.float64):
+    return pulse_train(signal_duration, pulse_duration, step, baseline=-1.0, dtype=dtype, pulses=pulses)
+
+
+# функция генерации синусоидального сигнала (частота и сдвиг - числа или списки по каналам)
+def generate_harmonic(frequency, duration, step, shift, dtype=np.float64):
     t = np.arange(0.0, duration + 0.001, step)
-    if shift != 0:
-        signal = np.sin(2 * np.pi * frequency * t + shift)
-    else:
-        signal = np.sin(2 * np.pi * frequency * t)
-    return t, signal
+    signal = np.sin(2 * np.pi * _channels(frequency) * t + _channels(shift))
+    return Signal(signal, step, dtype=dtype)
 
 
 # функция генерации полигармонического сигнала
-def generate_poliharmonic(frequencies, duration, step):
-    t = np.arange(0.0, duration + 0.001, step)
-    signal = sum(np.sin(2 * np.pi * f * t) for f in frequencies)
-    return t, signal
+def generate_poliharmonic(frequencies, duration, step, dtype=np.float64):
+    signal = polyharmonic_synthesis(frequencies, samples_count(duration + 0.001, step), step)
+    return Signal(signal, step, dtype=dtype)
 
 
 # Функция генерации затухающей синусоиды
-def generate_damped_sine(alpha, frequency, duration, step):
+def generate_damped_sine(alpha, frequency, duration, step, dtype=np.float64):
     t = np.arange(0.0, duration + 0.001, step)
-    signal = np.exp(-alpha * t) * np.sin(2 * np.pi * frequency * t)
-    return t, signal
\ No newline at end of file
+    signal = np.exp(-_channels(alpha) * t) * np.sin(2 * np.pi * _channels(frequency) * t)
+    return Signal(signal, step, dtype=dtype)
+
+
+# генераторы, которые можно зашумить (generate_noisy)
+NOISY_BASES = {'generate_unipolar_pulses': generate_unipolar_pulses, 'generate_bipolar_pulses': generate_bipolar_pulses,
+               'generate_harmonic': generate_harmonic, 'generate_poliharmonic': generate_poliharmonic,
+               'generate_damped_sine': generate_damped_sine}
+
+
+# зашумлённый сигнал: base - имя генератора из NOISY_BASES и его параметры, шум вида noise
+# (см. signal_noise_generator.noise_generator.mixing) с ОСШ snr_db (дБ), noise_params - пары
+# (имя, значение); шум добавляется прямо в отсчёты сформированного сигнала. Шум задаётся
+# собственным генератором с начальным значением seed, а не общим состоянием np.random:
+# сигналы формируются в общем пуле потоков, и одинаковый seed должен давать одинаковый шум
+def generate_noisy(base, noise, snr_db, seed=0, noise_params=(), dtype=np.float64):
+    if base[0] not in NOISY_BASES:
+        raise ValueError(f'Неизвестный генератор: {base[0]}')
+    rng = np.random.default_rng(seed)
+    sig = NOISY_BASES[base[0]](*base[1:], dtype=dtype)
+    return mixing.add_noise(sig, [(noise, snr_db, dict(noise_params))], out=sig.samples, rng=rng)
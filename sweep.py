@@ -0,0 +1,137 @@
+import argparse
+import itertools
+import os
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import resource_tracker, shared_memory
+
+import numpy as np
+
+import signals
+from signal_noise_generator.noise_generator import noises
+from signal_noise_generator.spectrum import spectra
+
+# Перебор сетки параметров генератора из signals.py: для каждой комбинации формируется
+# сигнал (с белым шумом уровня noise_level) и его амплитудный спектр. Комбинации считаются
+# параллельно в пуле процессов; результаты передаются через разделяемую память, а не
+# сериализацией массивов. Итог - столбцовый файл .npz: по массиву на каждый параметр,
+# сигналы подряд в 'signal' со смещениями 'offset', спектры - строки матрицы 'spectrum'.
+
+
+# копирование массивов в новый блок разделяемой памяти; возвращается только имя блока
+def _to_shared(*arrays):
+    block = shared_memory.SharedMemory(create=True, size=max(1, sum(a.nbytes for a in arrays)))
+    position = 0
+    for a in arrays:
+        np.ndarray(a.shape, a.dtype, buffer=block.buf, offset=position)[...] = a
+        position += a.nbytes
+    name = block.name
+    block.close()
+    # блок освобождает родительский процесс (_release), снимаем учёт в этом процессе
+    # (трекер регистрирует блоки только в POSIX, под именем с ведущей '/')
+    if os.name == 'posix':
+        resource_tracker.unregister('/' + name, 'shared_memory')
+    return name
+
+
+def _from_shared(name, shapes):
+    block = shared_memory.SharedMemory(name=name)
+    arrays, position = [], 0
+    for shape in shapes:
+        a = np.ndarray(shape, np.float64, buffer=block.buf, offset=position)
+        arrays.append(a.copy())
+        position += a.nbytes
+    block.close()
+    return arrays
+
+
+def _release(name):
+    try:
+        block = shared_memory.SharedMemory(name=name)
+    except FileNotFoundError:
+        return
+    block.close()
+    block.unlink()
+
+
+def run_one(generator, params, noise_level=0.0, bpf=1024, seed=0):
+    np.random.seed(seed)
+    sig = getattr(signals, generator)(**params)
+    s = np.asarray(sig.samples, dtype=np.float64)
+    if noise_level:
+        s = s + noises.white_noise(len(s), 0, noise_level)
+    amplitude = spectra.spectrum(s, sig.delta_t, bpf).amplitude
+    return s, amplitude
+
+
+def _run_shared(generator, params, noise_level, bpf, seed):
+    s, amplitude = run_one(generator, params, noise_level, bpf, seed)
+    return _to_shared(s, amplitude), len(s)
+
+
+def grid_points(grid, noise_levels=(0.0,)):
+    names = list(grid)
+    for values in itertools.product(*(grid[name] for name in names), noise_levels):
+        yield dict(zip(names, values[:-1])), values[-1]
+
+
+def run_sweep(generator, grid, noise_levels=(0.0,), bpf=1024, workers=None, output=None, seed=0):
+    points = list(grid_points(grid, noise_levels))
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(_run_shared, generator, params, noise_level, bpf, seed + i)
+                   for i, (params, noise_level) in enumerate(points)]
+    # пул дожидается всех комбинаций; блоки успешных освобождаются и тогда, когда другая упала
+    blocks = [future.result() for future in futures if future.exception() is None]
+    try:
+        for future in futures:
+            future.result()  # ошибка первой неудачной комбинации
+        results = [_from_shared(name, [(length,), (bpf // 2 + 1,)]) for name, length in blocks]
+    finally:
+        for name, _ in blocks:
+            _release(name)
+
+    columns = {}
+    for name in grid:
+        values = [params[name] for params, _ in points]
+        # списки (например, частоты полигармонического сигнала) сохраняются строками
+        columns[name] = np.array([';'.join(map(str, v)) if isinstance(v, (list, tuple)) else v for v in values])
+    columns['noise_level'] = np.array([noise_level for _, noise_level in points])
+    lengths = np.array([len(s) for s, _ in results])
+    columns['points'] = lengths
+    columns['offset'] = np.concatenate(([0], np.cumsum(lengths)[:-1]))
+    columns['signal'] = np.concatenate([s for s, _ in results]) if results else np.empty(0)
+    columns['spectrum'] = np.array([amplitude for _, amplitude in results]).reshape(len(results), bpf // 2 + 1)
+    if output is not None:
+        np.savez(output, **columns)
+    return columns
+
+
+# значение параметра: число или список чисел через ';'
+def _parse_value(text):
+    if ';' in text:
+        return [float(v) for v in text.split(';') if v.strip()]
+    return float(text)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Перебор параметров генератора сигналов')
+    parser.add_argument('generator', help='имя функции из signals.py, например generate_harmonic')
+    parser.add_argument('--grid', action='append', default=[], metavar='ИМЯ=ЗНАЧ1,ЗНАЧ2',
+                        help='значения параметра генератора (список чисел внутри значения - через ;)')
+    parser.add_argument('--noise', default='0', help='уровни белого шума (СКО) через запятую')
+    parser.add_argument('--bpf', type=int, default=1024, help='число точек БПФ')
+    parser.add_argument('--workers', type=int, default=os.cpu_count())
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('-o', '--output', default='sweep.npz')
+    args = parser.parse_args(argv)
+
+    grid = {}
+    for item in args.grid:
+        name, values = item.split('=', 1)
+        grid[name.strip()] = [_parse_value(v) for v in values.split(',')]
+    noise_levels = [float(v) for v in args.noise.split(',')]
+    columns = run_sweep(args.generator, grid, noise_levels, args.bpf, args.workers, args.output, args.seed)
+    print(f'{len(columns["points"])} комбинаций, {columns["points"].sum()} отсчётов -> {args.output}')
+
+
+if __name__ == '__main__':
+    main()
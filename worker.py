@@ -0,0 +1,99 @@
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+
+import profiling
+from signal_noise_generator import progress as checkpoints
+
+# Фоновые задания (формирование сигнала, спектры) в общем для процесса пуле потоков:
+# numpy и БПФ отпускают GIL, поэтому долгий расчёт одной сессии не останавливает остальные.
+# Задания хранятся по слотам в словаре сессии; новое задание в слоте отменяет прежнее.
+# Отмена кооперативная: не начатое задание снимается с очереди, начатое прерывается
+# при следующем вызове progress().
+
+WORKERS = int(os.environ.get('SNG_WORKERS', 2))
+
+_executor = ThreadPoolExecutor(WORKERS, thread_name_prefix='signal-worker')
+_local = threading.local()
+
+
+class Cancelled(Exception):
+    pass
+
+
+class Job:
+    def __init__(self, key, text, function):
+        self.key = key
+        self.text = text
+        self.progress = 0.0
+        self._created = time.perf_counter()
+        self._cancel = threading.Event()
+        self.future = _executor.submit(self._run, function)
+
+    def _run(self, function):
+        if self._cancel.is_set():
+            raise Cancelled()
+        _local.job = self
+        try:
+            return function()
+        finally:
+            _local.job = None
+
+    @property
+    def elapsed(self):
+        return time.perf_counter() - self._created
+
+    def cancel(self):
+        self._cancel.set()
+        self.future.cancel()
+
+    def cancelled(self):
+        return self._cancel.is_set()
+
+    def done(self):
+        return self.future.done()
+
+    # ожидание не дольше timeout секунд; True, если задание завершено
+    def wait(self, timeout=None):
+        wait([self.future], timeout)
+        return self.future.done()
+
+    def result(self):
+        return self.future.result()
+
+
+# ход выполнения из кода задания (вне задания ничего не делает); fraction=None - только проверка отмены
+def progress(fraction, text=None):
+    job = getattr(_local, 'job', None)
+    if job is None:
+        return
+    if job.cancelled():
+        raise Cancelled()
+    if fraction is not None:
+        job.progress = fraction
+    if text is not None:
+        job.text = text
+
+
+# точки проверки в циклах генераторов и спектров (signal_noise_generator.progress)
+checkpoints.handler = progress
+
+
+# задание в слоте: то же задание, если ключ не изменился, иначе прежнее отменяется
+def submit(jobs, slot, key, text, function, *args):
+    job = jobs.get(slot)
+    if job is not None and job.key == key:
+        return job
+    if job is not None:
+        job.cancel()
+    # при включённом профилировании задание замеряется как отложенный этап запуска
+    call = profiling.deferred(lambda: function(*args), f'Фоновое задание: {text}')
+    job = jobs[slot] = Job(key, text, call)
+    return job
+
+
+def discard(jobs, slot):
+    job = jobs.pop(slot, None)
+    if job is not None:
+        job.cancel()